@@ -1,17 +1,25 @@
 # GUI.py
+# Açılış zamanlayıcısı diğer importlardan önce yüklenir ki import süresi de ölçülsün
+from startup_timing import mark, record, report
 from operator import index
 import pygame
 from engine import Game, Ship
 from log_helper import set_username
 from login import login_screen
 from ai_agent import QLearningAgent
+from ai_worker import AIMoveWorker
 import pickle
 import sys
-from Log_Analiz import load_logs, plot_average_turns, plot_heatmap, plot_ship_placement
-import os
+from Log_Analiz import load_aggregates, render_average_turns, render_ship_placement, figure_to_rgba
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
+mark("import")
 username = login_screen()
-agent = QLearningAgent(username)
+mark("giriş")
+# Q-table diskten okunması ve log öğrenimi menü gösterildikten sonra arka planda yapılır
+agent = QLearningAgent(username, journal=True, load=False)
 set_username(username)
 pygame.init()
 pygame.font.init()
@@ -49,7 +57,28 @@ ORANGE = (250, 140, 20)
 COLORS = {"U": GRAY, "M": BLUE, "H": ORANGE, "S": RED}
 
 ANALYSIS_BUTTONS = []
-GRAPH_IMAGE = None
+# Analiz grafikleri arka plan iş parçacığında belleğe çizilir; ana döngü sadece
+# hazır olan, panel boyutuna bir kez ölçeklenmiş yüzeyi blit eder.
+CHART_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix="charts")
+CHART_JOB = None
+CHART_LABEL = None
+CHART_GAME = None
+GRAPH_SURFACE = None
+# Q-table grafiği learn_from_logs çalıştırır; bu sırada AI işçisi tabloya dokunmasın
+AGENT_LOCK = threading.Lock()
+AGENT_READY = threading.Event()
+
+def load_agent():
+    """Arka planda Q-table'ı yükler ve yeni logları öğrenir; bitene kadar AI hamle yapmaz."""
+    started = time.perf_counter()
+    try:
+        with AGENT_LOCK:
+            agent.load()
+    except Exception as e:
+        print(f"Q-table yüklenemedi: {e}")
+    record("ajan (arka plan)", time.perf_counter() - started)
+    print(f"AI hazır ({(time.perf_counter() - started) * 1000:.0f} ms)")
+    AGENT_READY.set()
 
 def draw_grid(player, left=0, top=0, search=False):
     for i in range(100):
@@ -69,7 +98,7 @@ def draw_a_line(left=WIDTH - H_MARGIN // 2 + H_MARGIN, top=0):
 
 def draw_button(text, rect, color_bg, color_text):
     pygame.draw.rect(SCREEN, color_bg, rect, border_radius=8)
-    label = button_font.render(text, True, color_text)
+    label = text_surface(text, button_font, color_text)
     label_rect = label.get_rect(center=rect.center)
     SCREEN.blit(label, label_rect)
 
@@ -86,16 +115,59 @@ def draw_ship(player, left=0, top=0):
         rectangle = pygame.Rect(x, y, width, height)
         pygame.draw.rect(SCREEN, GREEN, rectangle, border_radius=15)
 
-def draw_statistics_panel(game):
-    global GRAPH_IMAGE
+def render_chart(label):
+    """Grafik iş parçacığında çalışır: grafiği Agg ile RGBA byte'larına çizer."""
+    if label == "Atış Sayısı":
+        fig = render_average_turns(load_aggregates())
+    elif label == "Heatmap allships":
+        fig = render_ship_placement(load_aggregates())
+    else:
+        AGENT_READY.wait()
+        with AGENT_LOCK:
+            fig = agent.render_aggregated_qtable()
+    return None if fig is None else figure_to_rgba(fig)
+
+def request_chart(label):
+    global CHART_JOB, CHART_LABEL
+    CHART_LABEL = label
+    CHART_JOB = CHART_POOL.submit(render_chart, label)
+
+def poll_chart():
+    """Biten grafik işini pygame yüzeyine çevirip ölçekler ve önbelleğe alır."""
+    global CHART_JOB, GRAPH_SURFACE
+    if CHART_JOB is None or not CHART_JOB.done():
+        return
+    job, CHART_JOB = CHART_JOB, None
+    try:
+        result = job.result()
+    except Exception as e:
+        print(f"Grafik çizilemedi: {e}")
+        return
+    if result is None:
+        return
+    raw, size = result
+    img = pygame.image.frombuffer(raw, size, "RGBA")
+    GRAPH_SURFACE = pygame.transform.smoothscale(img, (STAT_AREA_WIDTH - 40, STAT_AREA_WIDTH - 40))
+
+_TEXT_CACHE = {}
+
+def text_surface(text, font=button_font, color=WHITE):
+    """Aynı metni her karede yeniden render etmemek için yüzey önbelleği."""
+    key = (text, font, color)
+    surf = _TEXT_CACHE.get(key)
+    if surf is None:
+        if len(_TEXT_CACHE) > 256:
+            _TEXT_CACHE.clear()
+        surf = _TEXT_CACHE[key] = font.render(text, True, color)
+    return surf
+
+def draw_statistics_panel(game, extra_lines=()):
     panel_x = STAT_ORIGIN[0] + 20
     panel_y = STAT_ORIGIN[1] + 20
-    font = pygame.font.SysFont("arial", 24)
     line_spacing = 30
 
     def render_line(text, y_offset):
-        text_surf = font.render(text, True, WHITE)
-        SCREEN.blit(text_surf, (panel_x, panel_y + y_offset))
+        SCREEN.blit(text_surface(text), (panel_x, panel_y + y_offset))
 
     render_line("\U0001F4CA Oyun Durumu:", 0)
     render_line("Bitti" if game.over else "Devam ediyor", line_spacing)
@@ -114,13 +186,16 @@ def draw_statistics_panel(game):
         last_player = 2 if game.player1_turn else 1
         render_line(f"Son Hamle: Oyuncu {last_player}", line_spacing * 6)
 
+    for i, text in enumerate(extra_lines):
+        render_line(text, line_spacing * (7 + i))
+
     ANALYSIS_BUTTONS.clear()
     labels = [
         ("Atış Sayısı", "plot_avg_turns.png"),
         ("Heatmap Q-table", "plot_qtable_heatmap.png"),
         ("Heatmap allships", "plot_heatmap_ships.png")
     ]
-    b_y = panel_y + line_spacing * 7
+    b_y = panel_y + line_spacing * (7 + len(extra_lines))
     button_width, button_height = 160, 40
     spacing = 10
 
@@ -129,13 +204,10 @@ def draw_statistics_panel(game):
         draw_button(text, rect, BLUE, WHITE)
         ANALYSIS_BUTTONS.append((rect, text))
 
-    if GRAPH_IMAGE:
-        try:
-            img = pygame.image.load(GRAPH_IMAGE)
-            img = pygame.transform.scale(img, (STAT_AREA_WIDTH - 40, STAT_AREA_WIDTH - 40))
-            SCREEN.blit(img, (panel_x, b_y + button_height + 20))
-        except:
-            pass
+    if CHART_JOB is not None:
+        render_line("Grafik çiziliyor…", b_y - panel_y + button_height + 20)
+    elif GRAPH_SURFACE is not None:
+        SCREEN.blit(GRAPH_SURFACE, (panel_x, b_y + button_height + 20))
 
 
 # GUI.py'ye yeni fonksiyonlar ekleyin
@@ -268,10 +340,86 @@ def check_collision(ship1, ship2):
 
 
 
+class Renderer:
+    """
+    Retained-mode çizici: ızgara çizgileri, ayırıcı çizgi ve gemiler oyun başına bir
+    kez statik katmana çizilir. Sonraki karelerde sadece make_move'un değiştirdiği
+    hücreler, içeriği değişen istatistik paneli ve bitiş yazısı yeniden çizilir;
+    ekrana pygame.display.update(dirty_rects) ile yalnız bu bölgeler gönderilir.
+    """
+
+    def __init__(self):
+        self.game = None
+        self.static = None
+        self.cells = set()
+        self.dirty = []
+        self.panel_key = None
+        self.over_drawn = False
+
+    def reset(self, game):
+        self.game = game
+        SCREEN.fill(GRAY)
+        draw_grid(game.player1)
+        draw_grid(game.player2, left=P2_LEFT, top=P2_TOP)
+        draw_grid(game.player1, top=P2_TOP)
+        draw_grid(game.player2, left=P2_LEFT)
+        draw_a_line()
+        draw_ship(game.player1, top=P2_TOP)
+        draw_ship(game.player2, left=P2_LEFT)
+        self.static = SCREEN.copy()
+        self.cells = {(p, i) for p in (1, 2) for i in range(100)}
+        self.panel_key = None
+        self.over_drawn = False
+        self.dirty = [SCREEN.get_rect()]
+
+    def mark_move(self, game, player, index, result):
+        """make_move sonucuna göre yeniden çizilecek hücreleri işaretler."""
+        if result is None or game is not self.game:
+            return  # yeni oyun zaten reset ile baştan çizilecek
+        self.cells.add((player, index))
+        if result == "sunk":
+            search = self.game.player1.search if player == 1 else self.game.player2.search
+            self.cells.update((player, i) for i in range(100) if search[i] == "S")
+
+    def _draw_cell(self, player, i):
+        left, top = (0, 0) if player == 1 else (P2_LEFT, P2_TOP)
+        rect = pygame.Rect(left + i % 10 * SQ_SIZE, top + i // 10 * SQ_SIZE, SQ_SIZE, SQ_SIZE)
+        SCREEN.blit(self.static, rect, rect)
+        search = self.game.player1.search if player == 1 else self.game.player2.search
+        pygame.draw.circle(SCREEN, COLORS[search[i]], rect.center, radius=SQ_SIZE // 4)
+        self.dirty.append(rect)
+
+    def draw(self, game, extra_lines=()):
+        if game is not self.game:
+            self.reset(game)
+        for player, i in self.cells:
+            self._draw_cell(player, i)
+        self.cells.clear()
+
+        key = (game.over, game.player1_turn, game.n_shots, CHART_JOB is not None, id(GRAPH_SURFACE),
+               tuple(extra_lines))
+        if key != self.panel_key:
+            self.panel_key = key
+            panel = pygame.Rect(STAT_ORIGIN[0], STAT_ORIGIN[1], STAT_AREA_WIDTH, SCREEN_HEIGHT)
+            SCREEN.blit(self.static, panel, panel)
+            draw_statistics_panel(game, extra_lines)
+            self.dirty.append(panel)
+
+        if game.over and not self.over_drawn:
+            self.over_drawn = True
+            textbox = myfont.render("Player" + str(game.result) + " wins!", False, GRAY, WHITE)
+            self.dirty.append(SCREEN.blit(textbox, (WIDTH // 2 - 240, HEIGHT // 2 - 50)))
+
+        if self.dirty:
+            pygame.display.update(self.dirty)
+            self.dirty = []
+
+
 def run_menu():
     show_menu = True
     clock = pygame.time.Clock()
     menu_background = pygame.image.load("menu_background.jpg")
+    shown = False
     while show_menu:
         SCREEN.blit(menu_background, (0, 0))
         pvp_button = pygame.Rect(SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT // 2 - 130, 250, 60)
@@ -283,6 +431,10 @@ def run_menu():
         draw_button("AI vs Player", AI_vs_Player, BLUE, WHITE)
         draw_button("Quit Game", quit_button, RED, WHITE)
         draw_button("Player vs Player", pvp_button, GREEN, WHITE)
+        if not shown:
+            shown = True
+            mark("menü")
+            print(report())
 
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -303,20 +455,108 @@ def run_menu():
         pygame.display.flip()
         clock.tick(60)
 
+mark("ekran")
+threading.Thread(target=load_agent, name="agent-load", daemon=True).start()
 HUMAN1, HUMAN2 = run_menu()
-game = Game(HUMAN1, HUMAN2)
+game = Game(HUMAN1, HUMAN2, track_density=True)
 
 P1_RECT = pygame.Rect(0, 0, SQ_SIZE * 10, SQ_SIZE * 10)
 P2_LEFT = (WIDTH - H_MARGIN) // 2 + H_MARGIN
 P2_TOP = (HEIGHT - V_MARGIN) // 2 + V_MARGIN
 P2_RECT = pygame.Rect(P2_LEFT, P2_TOP, SQ_SIZE * 10, SQ_SIZE * 10)
 
+FPS = 30
+AI_MOVE_MS = 100  # 1x hızda AI hamleleri arası süre (eski sabit wait(100) temposu)
+# İzleyici (AI vs AI) modu: simülasyon hızı çizim hızından bağımsızdır.
+# None = sınırsız; kare başına SIM_BUDGET saniye boyunca hamle oynanır.
+SPEEDS = (1, 2, 5, 10, 50, None)
+SIM_BUDGET = 0.8 / FPS
+SERIES_GAMES = 10
+AI_MOVE_DEADLINE = 0.25  # bu sürede hesaplanamayan AI hamlesi yerine yedek hamle
+SPECTATOR = not HUMAN1 and not HUMAN2
+
+def play_move(index):
+    """Hamleyi yapar ve değişen hücreleri çiziciye bildirir."""
+    player = 1 if game.player1_turn else 2
+    result = game.make_move(index)
+    renderer.mark_move(game, player, index, result)
+    return result
+
+def ai_move(wait=0.0):
+    """
+    AI hamlesini işçiden alıp oynar. Hamle hâlâ hesaplanıyorsa en fazla wait
+    saniye bekler ve False döndürür; çizim döngüsü bloklanmaz.
+    """
+    if not AGENT_READY.is_set():
+        return False
+    current_search = game.player1.search if game.player1_turn else game.player2.search
+    ready, action = ai_worker.move((game, game.n_shots), current_search, game.current_density, wait)
+    if not ready or action is None:
+        return False
+    prev_search = tuple(current_search)
+    play_move(action)
+    result = current_search[action]
+    reward = -0.1 if result == "M" else 1 if result == "H" else 3
+    ai_worker.learn(prev_search, action, reward, tuple(current_search))
+    return True
+
+def start_series(n_games):
+    """Sıradaki n_games oyunu art arda oynatır; panelde toplu sonuçlar gösterilir."""
+    global game
+    series.update(left=n_games, total=n_games, played=0, shots=0, wins={1: 0, 2: 0}, game=None)
+    game = Game(HUMAN1, HUMAN2, track_density=True)
+
+def advance_ai(wait=0.0):
+    """Simülasyonu bir adım ilerletir; ilerleyecek bir şey yoksa False."""
+    global game
+    if game.over:
+        if series["game"] is not game and series["left"] > 0:
+            series["game"] = game
+            series["left"] -= 1
+            series["played"] += 1
+            series["shots"] += game.n_shots
+            series["wins"][game.result] += 1
+            if series["left"] > 0:
+                game = Game(HUMAN1, HUMAN2, track_density=True)
+                return True
+        return False
+    if not game.computer_turn:
+        return False
+    return ai_move(wait)
+
+def panel_lines():
+    lines = list(spectator_lines())
+    if not AGENT_READY.is_set():
+        lines.insert(0, "AI yükleniyor…")
+    return lines
+
+def spectator_lines():
+    if not SPECTATOR:
+        return ()
+    speed = SPEEDS[speed_index]
+    lines = [f"Hız: {'MAX' if speed is None else f'x{speed}'}  [+/-] hız, [N] {SERIES_GAMES} oyun"]
+    if series["total"]:
+        played = series["played"]
+        p1 = series["wins"][1] * 100 / played if played else 0
+        avg = series["shots"] / played if played else 0
+        lines.append(f"Seri: {played}/{series['total']}, P1 %{p1:.0f}, ort. {avg:.1f} atış")
+    return lines
+
+renderer = Renderer()
+ai_worker = AIMoveWorker(agent, lock=AGENT_LOCK, deadline=AI_MOVE_DEADLINE)
+clock = pygame.time.Clock()
+series = {"left": 0, "total": 0, "played": 0, "shots": 0, "wins": {1: 0, 2: 0}, "game": None}
+speed_index = 0
+ai_credit = 0.0
+last_tick = pygame.time.get_ticks()
 running = True
 pausing = False
 while running:
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             running = False
+        if event.type == pygame.VIDEOEXPOSE:
+            renderer.game = None  # pencere yeniden açığa çıktı; her şeyi yeniden çiz
 
         if event.type == pygame.MOUSEBUTTONDOWN:
             x, y = pygame.mouse.get_pos()
@@ -324,45 +564,17 @@ while running:
                 row = (y - P1_RECT.top) // SQ_SIZE
                 col = (x - P1_RECT.left) // SQ_SIZE
                 index = row * 10 + col
-                game.make_move(index)
+                play_move(index)
             elif not game.player1_turn and P2_RECT.collidepoint(x, y):
                 row = (y - P2_RECT.top) // SQ_SIZE
                 col = (x - P2_RECT.left) // SQ_SIZE
                 index = row * 10 + col
-                game.make_move(index)
+                play_move(index)
 
             for rect, label in ANALYSIS_BUTTONS:
                 if rect.collidepoint(x, y):
-                    df_moves, df_ships = load_logs()
-                    if label == "Atış Sayısı":
-                        plot_average_turns(df_moves)
-                        GRAPH_IMAGE = "plot_avg_turns.png"
-                    elif label == "Heatmap allships":
-                        plot_ship_placement(df_ships, save_path="plot_heatmap_ships.png")
-                        GRAPH_IMAGE = "plot_heatmap_ships.png"
-
-
-
-                    elif label == "Heatmap Q-table":
-
-                        # Eski heatmap'i sil
-
-                        heatmap_path = "plot_qtable_heatmap.png"
-
-                        if os.path.exists(heatmap_path):
-                            os.remove(heatmap_path)
-
-                        # Ayrı oyun dosyalarından öğren
-
-                        agent.learn_from_logs()
-
-                        # Yeni heatmap oluştur
-
-                        agent.plot_aggregated_qtable()
-
-                        GRAPH_IMAGE = heatmap_path
-
-                        pygame.display.flip()
+                    # Grafik arka planda kalıcı özetlerden (Q-table için loglardan) çizilir
+                    request_chart(label)
 
         if event.type == pygame.KEYDOWN:
             if event.key == pygame.K_ESCAPE:
@@ -370,38 +582,44 @@ while running:
             if event.key == pygame.K_SPACE:
                 pausing = not pausing
             if event.key == pygame.K_RETURN:
-                game = Game(HUMAN1, HUMAN2)
-
+                game = Game(HUMAN1, HUMAN2, track_density=True)
+            if SPECTATOR and event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+                speed_index = min(speed_index + 1, len(SPEEDS) - 1)
+            if SPECTATOR and event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                speed_index = max(speed_index - 1, 0)
+            if SPECTATOR and event.key == pygame.K_n:
+                start_series(SERIES_GAMES)
+
+    now = pygame.time.get_ticks()
+    elapsed, last_tick = now - last_tick, now
     if not pausing:
         if not LOGIN:
             username = login_screen()
             LOGIN = True
         else:
-            SCREEN.fill(GRAY)
-            draw_grid(game.player1, search=True)
-            draw_grid(game.player2, search=True, left=P2_LEFT, top=P2_TOP)
-            draw_grid(game.player1, top=P2_TOP)
-            draw_grid(game.player2, left=P2_LEFT)
-            draw_a_line()
-            draw_ship(game.player1, top=P2_TOP)
-            draw_ship(game.player2, left=P2_LEFT)
-            draw_statistics_panel(game)
-
-            if not game.over and game.computer_turn:
-                current_search = game.player1.search if game.player1_turn else game.player2.search
-                action = agent.choose_action(current_search)
-                if action is not None:
-                    prev_search = current_search.copy()
-                    game.make_move(action)
-                    result = current_search[action]
-                    reward = -0.1 if result == "M" else 1 if result == "H" else 3
-                    next_search = current_search
-                    agent.update_q(prev_search, action, reward, next_search)
-
-            if game.over:
-                text = "Player" + str(game.result) + " wins!"
-                textbox = myfont.render(text, False, GRAY, WHITE)
-                SCREEN.blit(textbox, (WIDTH // 2 - 240, HEIGHT // 2 - 50))
-
-        pygame.time.wait(100)
-        pygame.display.flip()
+            poll_chart()
+
+            # Simülasyon çizimden bağımsız ilerler: hız çarpanı kadar hamle kredisi
+            # birikir, sınırsız modda kare bütçesi dolana kadar oynanır. Hamleler
+            # işçide hesaplanır; bir karede en fazla SIM_BUDGET kadar beklenir.
+            speed = SPEEDS[speed_index] if SPECTATOR else 1
+            deadline = time.perf_counter() + SIM_BUDGET
+            if speed is None:
+                while advance_ai(deadline - time.perf_counter()):
+                    if time.perf_counter() >= deadline:
+                        break
+            else:
+                ai_credit = min(ai_credit + elapsed * speed / AI_MOVE_MS, 2 * speed)
+                while ai_credit >= 1 and advance_ai(max(0.0, deadline - time.perf_counter())):
+                    ai_credit -= 1
+                if game.over or not game.computer_turn:
+                    ai_credit = min(ai_credit, 1)
+
+            # Oyun bitince veriler değişti; açık grafiği yeniden çiz
+            if game.over and CHART_LABEL and CHART_GAME is not game and CHART_JOB is None:
+                CHART_GAME = game
+                request_chart(CHART_LABEL)
+
+            renderer.draw(game, panel_lines())
+
+    clock.tick(FPS)
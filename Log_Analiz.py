@@ -1,134 +1,288 @@
 # Log_Analiz.py
-import json
-import glob
-import os
+from array import array
+from itertools import repeat
 from pathlib import Path
 import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
+# pandas ve matplotlib ilk kullanıldıkları fonksiyonda import edilir; GUI açılışını yavaşlatmasınlar
 
-from log_helper import LOGS_DIR
+from log_helper import LOGS_DIR, flush_logs
+import analytics_store
+from game_record import RESULTS, RESULT_CODES
+from game_store import iter_user_games
 
-def load_logs(root_dir=LOGS_DIR):
-    records = []
-    ship_placement = []
+# (kolon, array tipi) - akış sırasında array.array'e eklenir, sonunda
+# np.frombuffer ile kopyasız NumPy dizisine çevrilir
+MOVE_COLUMNS = (("game", "i"), ("user", "i"), ("turn", "h"), ("player", "b"),
+                ("row", "b"), ("col", "b"), ("result", "b"))
+SHIP_COLUMNS = (("game", "i"), ("user", "i"), ("player", "b"), ("size", "b"),
+                ("row", "b"), ("col", "b"))
+GAME_COLUMNS = (("game_id", "i"), ("user", "i"), ("winner", "b"), ("total_turns", "h"))
+SHIP_PLAYERS = ("player1_ships", "player2_ships")
+
+
+def _to_numpy(columns, spec):
+    return {name: np.frombuffer(columns[name], dtype=np.dtype(code)) if len(columns[name])
+            else np.zeros(0, np.dtype(code)) for name, code in spec}
+
+
+def load_columns(root_dir=LOGS_DIR):
+    """
+    Tüm kullanıcıların oyunlarını akıtarak kolon dizilerine doldurur; satır başına
+    Python nesnesi tutulmaz. Dönen sözlük:
+        moves: game, user, turn, player, row, col, result (RESULTS kodu, -1 bilinmiyor)
+        ships: game, user, player, size, row, col (her gemi hücresi bir satır)
+        games: game_id (game_ids kodu), user, winner (0 yok), total_turns
+        game_ids, user_ids: kategorik kod tabloları
+    moves/ships içindeki game alanı games dizilerinin satır numarasıdır.
+    """
+    flush_logs()  # arka planda yazılmayı bekleyen oyunlar da dahil olsun
+    moves = {name: array(code) for name, code in MOVE_COLUMNS}
+    ships = {name: array(code) for name, code in SHIP_COLUMNS}
+    games = {name: array(code) for name, code in GAME_COLUMNS}
+    game_codes, user_codes = {}, {}
     root = Path(root_dir)
 
-    for user_dir in root.iterdir():
+    for user_dir in sorted(root.iterdir()):
         if not user_dir.is_dir():
             continue
-        combined_file = user_dir / "combined_logs.json"
-        if combined_file.exists():
-            json_paths = [combined_file]
-        else:
-            json_paths = list(user_dir.glob("*.json"))
-
-        for path in json_paths:
-            try:
-                data_list = json.load(open(path, encoding='utf-8'))
-            except Exception:
-                continue
-
-            entries = data_list if isinstance(data_list, list) else [data_list]
-            for data in entries:
-                gid = data.get('game_id')
-                uid = data.get('user_id')
-                total_turns = data.get('total_turns')
-                winner = data.get('winner')
-
-                for mv in data.get('moves', []):
-                    records.append({
-                        'game_id': gid,
-                        'user_id': uid,
-                        'winner': winner,
-                        'total_turns': total_turns,
-                        'turn': mv.get('turn'),
-                        'player': mv.get('player'),
-                        'row': mv.get('cell', {}).get('row'),
-                        'col': mv.get('cell', {}).get('col'),
-                        'result': mv.get('result')
-                    })
-
-                for player_label in ['player1_ships', 'player2_ships']:
-                    for ship in data.get(player_label, []):
-                        size = ship.get('size')
-                        for idx in ship.get('cells', []):
-                            r, c = divmod(idx, 10)
-                            ship_placement.append({
-                                'game_id': gid,
-                                'user_id': uid,
-                                'player': player_label,
-                                'size': size,
-                                'row': r,
-                                'col': c
-                            })
-
-    df_moves = pd.DataFrame(records)
-    df_ships = pd.DataFrame(ship_placement)
+        for data in iter_user_games(user_dir):
+            g = len(games["user"])
+            u = user_codes.setdefault(data.get('user_id'), len(user_codes))
+            games["game_id"].append(game_codes.setdefault(data.get('game_id'), len(game_codes)))
+            games["user"].append(u)
+            games["winner"].append(data.get('winner') or 0)
+            games["total_turns"].append(data.get('total_turns') or 0)
+
+            game_moves = data.get('moves', [])
+            moves["game"].extend(repeat(g, len(game_moves)))
+            moves["user"].extend(repeat(u, len(game_moves)))
+            for mv in game_moves:
+                cell = mv.get('cell') or {}
+                moves["turn"].append(mv.get('turn') or 0)
+                moves["player"].append(mv.get('player') or 0)
+                row, col = cell.get('row'), cell.get('col')
+                moves["row"].append(-1 if row is None else row)
+                moves["col"].append(-1 if col is None else col)
+                moves["result"].append(RESULT_CODES.get(mv.get('result'), -1))
+
+            for player, label in enumerate(SHIP_PLAYERS, start=1):
+                for ship in data.get(label, []):
+                    cells = ship.get('cells', [])
+                    ships["game"].extend(repeat(g, len(cells)))
+                    ships["user"].extend(repeat(u, len(cells)))
+                    ships["player"].extend(repeat(player, len(cells)))
+                    ships["size"].extend(repeat(ship.get('size') or 0, len(cells)))
+                    ships["row"].extend(idx // 10 for idx in cells)
+                    ships["col"].extend(idx % 10 for idx in cells)
+
+    return {
+        "moves": _to_numpy(moves, MOVE_COLUMNS),
+        "ships": _to_numpy(ships, SHIP_COLUMNS),
+        "games": _to_numpy(games, GAME_COLUMNS),
+        "game_ids": list(game_codes),
+        "user_ids": list(user_codes),
+    }
+
+
+def columns_to_frames(cols):
+    """load_columns çıktısından eski load_logs kolonlarıyla DataFrame'ler kurar."""
+    import pandas as pd
+
+    games, mv, sh = cols["games"], cols["moves"], cols["ships"]
+    game_ids = pd.Index(cols["game_ids"], dtype=object)
+    user_ids = pd.Index(cols["user_ids"], dtype=object)
+
+    df_moves = pd.DataFrame({
+        'game_id': pd.Categorical.from_codes(games["game_id"][mv["game"]], game_ids),
+        'user_id': pd.Categorical.from_codes(mv["user"], user_ids),
+        'winner': games["winner"][mv["game"]],
+        'total_turns': games["total_turns"][mv["game"]],
+        'turn': mv["turn"],
+        'player': mv["player"],
+        'row': mv["row"],
+        'col': mv["col"],
+        'result': pd.Categorical.from_codes(mv["result"], RESULTS),
+    }, copy=False)
+    df_ships = pd.DataFrame({
+        'game_id': pd.Categorical.from_codes(games["game_id"][sh["game"]], game_ids),
+        'user_id': pd.Categorical.from_codes(sh["user"], user_ids),
+        'player': pd.Categorical.from_codes(sh["player"] - 1, SHIP_PLAYERS),
+        'size': sh["size"],
+        'row': sh["row"],
+        'col': sh["col"],
+    }, copy=False)
     return df_moves, df_ships
 
+
+def load_logs(root_dir=LOGS_DIR):
+    return columns_to_frames(load_columns(root_dir))
+
+
+def load_aggregates(root_dir=LOGS_DIR, user=None):
+    """Kalıcı analiz özetini döndürür (user=None: tüm kullanıcılar)."""
+    flush_logs()
+    return analytics_store.load(root_dir, user)
+
+
+def _is_aggregate(data):
+    return isinstance(data, dict) and "shots_per_game" in data
+
+
+# Grafikler pyplot yerine doğrudan Figure nesnesine çizilir: pyplot'un global
+# durumu yok, bu yüzden GUI'nin arka plan iş parçacığında güvenle çalışır.
+def figure_to_rgba(fig):
+    """Figure'ı Agg ile belleğe çizer; (RGBA byte'ları, (genişlik, yükseklik))."""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    canvas = FigureCanvasAgg(fig)
+    canvas.draw()
+    return bytes(canvas.buffer_rgba()), canvas.get_width_height()
+
+
+def render_average_turns(df_moves):
+    from matplotlib.figure import Figure
+    fig = Figure()
+    ax = fig.add_subplot()
+    if _is_aggregate(df_moves):
+        hist = df_moves["shots_per_game"]
+        ax.hist([int(k) for k in hist], bins=20, weights=list(hist.values()))
+    else:
+        games = df_moves[['game_id', 'total_turns']].drop_duplicates()
+        ax.hist(games['total_turns'], bins=20)
+    ax.grid(True)
+    ax.set_title('Oyun Başına Atış Sayısı Dağılımı')
+    ax.set_xlabel('Atış Sayısı')
+    ax.set_ylabel('Oyun Adedi')
+    fig.tight_layout()
+    return fig
+
 def plot_average_turns(df_moves, save_path="plot_avg_turns.png"):
-    games = df_moves[['game_id', 'total_turns']].drop_duplicates()
-    plt.figure()
-    games['total_turns'].hist(bins=20)
-    plt.title('Oyun Başına Atış Sayısı Dağılımı')
-    plt.xlabel('Atış Sayısı')
-    plt.ylabel('Oyun Adedi')
-    plt.tight_layout()
-    plt.savefig(save_path)
-    plt.close()
-
-def plot_heatmap(df_moves, title='Heatmap - All Moves', save_path="plot_heatmap_moves.png"):
-    heat = np.zeros((10, 10), int)
-    for _, mv in df_moves.iterrows():
-        if pd.notna(mv.row) and pd.notna(mv.col):
-            heat[int(mv.row), int(mv.col)] += 1
-    heat_norm = heat / heat.max() if heat.max() > 0 else heat
-    plt.figure(figsize=(6, 6))
-    plt.imshow(heat_norm, origin='upper', interpolation='nearest')
-    plt.colorbar(label='Normalized Count')
-    plt.title(title)
-    plt.xlabel('Col')
-    plt.ylabel('Row')
-    plt.tight_layout()
-    plt.savefig(save_path)
-    plt.close()
-
-def plot_ship_placement(df_ships, size=None, save_path="plot_heatmap_ships.png"):
-    heat = np.zeros((10, 10), int)
-    subset = df_ships if size is None else df_ships[df_ships['size'] == size]
-    for _, s in subset.iterrows():
-        heat[int(s.row), int(s.col)] += 1
+    render_average_turns(df_moves).savefig(save_path)
+
+def _select(data, kind, user=None, result=None):
+    """
+    data: load_columns sözlüğü veya load_logs DataFrame'i. kind "moves"/"ships".
+    user (user_id) ve result ("miss"/"hit"/"sunk") ile süzülmüş kolonları döndürür.
+    """
+    if isinstance(data, dict):
+        cols = data[kind]
+        mask = np.ones(len(cols["row"]), bool)
+        if user is not None:
+            code = data["user_ids"].index(user) if user in data["user_ids"] else -1
+            mask &= cols["user"] == code
+        if result is not None:
+            mask &= cols["result"] == RESULT_CODES[result]
+        return {name: values[mask] for name, values in cols.items()}
+
+    df = data
+    if user is not None:
+        df = df[df['user_id'] == user]
+    if result is not None:
+        df = df[df['result'] == result]
+    cols = {name: df[name].to_numpy() for name in ('row', 'col', 'turn', 'size') if name in df}
+    return cols
+
+
+def _cells(cols):
+    row, col = cols["row"].astype(np.intp), cols["col"].astype(np.intp)
+    valid = (row >= 0) & (row < 10) & (col >= 0) & (col < 10)
+    return (row * 10 + col)[valid], valid
+
+
+def move_heatmap(data, user=None, result=None):
+    """Hücre başına atış sayısı (10, 10). Özetten okunuyorsa result yalnızca "hit" olabilir."""
+    if _is_aggregate(data):
+        if result not in (None, "hit"):
+            raise ValueError("Özetler yalnızca tüm atışları ve isabetleri tutar")
+        return np.array(data["hits" if result else "shots"]).reshape(10, 10)
+    cells, _ = _cells(_select(data, "moves", user, result))
+    return np.bincount(cells, minlength=100).reshape(10, 10)
+
+
+def turn_tensor(data, max_turn=None, user=None, result=None):
+    """(tur, 10, 10) atış sayısı tensörü; [t - 1] t. turdaki atışlar."""
+    cols = _select(data, "moves", user, result)
+    cells, valid = _cells(cols)
+    turns = cols["turn"].astype(np.intp)[valid]
+    if max_turn is None:
+        max_turn = int(turns.max()) if len(turns) else 0
+    keep = (turns >= 1) & (turns <= max_turn)
+    flat = (turns[keep] - 1) * 100 + cells[keep]
+    return np.bincount(flat, minlength=max_turn * 100).reshape(max_turn, 10, 10)
+
+
+def ship_heatmaps(data, user=None):
+    """{gemi boyutu: (10, 10) yerleşim sayısı}, tek geçişte."""
+    if _is_aggregate(data):
+        return {int(size): np.array(counts).reshape(10, 10)
+                for size, counts in sorted(data["placements"].items(), key=lambda kv: int(kv[0]))}
+    cols = _select(data, "ships", user)
+    cells, valid = _cells(cols)
+    sizes = cols["size"].astype(np.intp)[valid]
+    n_sizes = int(sizes.max()) + 1 if len(sizes) else 0
+    heat = np.zeros((n_sizes, 100), np.int64)
+    np.add.at(heat, (sizes, cells), 1)
+    return {size: heat[size].reshape(10, 10) for size in np.unique(sizes).tolist()}
+
+
+def _grid_figure(heat, title, xlabel='Col', ylabel='Row'):
+    from matplotlib.figure import Figure
     heat_norm = heat / heat.max() if heat.max() > 0 else heat
-    plt.figure(figsize=(6, 6))
-    plt.imshow(heat_norm, origin='upper', interpolation='nearest')
+    fig = Figure(figsize=(6, 6))
+    ax = fig.add_subplot()
+    im = ax.imshow(heat_norm, origin='upper', interpolation='nearest')
+    fig.colorbar(im, ax=ax, label='Normalized Count')
+    ax.set_title(title)
+    if xlabel:
+        ax.set_xlabel(xlabel)
+        ax.set_ylabel(ylabel)
+    fig.tight_layout()
+    return fig
+
+def _plot_grid(heat, title, save_path, xlabel='Col', ylabel='Row'):
+    _grid_figure(heat, title, xlabel, ylabel).savefig(save_path)
+
+def render_heatmap(df_moves, title='Heatmap - All Moves', user=None, result=None):
+    return _grid_figure(move_heatmap(df_moves, user, result), title)
+
+def plot_heatmap(df_moves, title='Heatmap - All Moves', save_path="plot_heatmap_moves.png",
+                 user=None, result=None):
+    render_heatmap(df_moves, title, user, result).savefig(save_path)
+
+def render_ship_placement(df_ships, size=None, user=None):
+    heats = ship_heatmaps(df_ships, user)
+    if size is None:
+        heat = sum(heats.values()) if heats else np.zeros((10, 10), int)
+    else:
+        heat = heats.get(size, np.zeros((10, 10), int))
     lbl = 'All Ships' if size is None else f'Size {size}'
-    plt.title(f'Ship Placement Heatmap - {lbl}')
-    plt.colorbar(label='Normalized Count')
-    plt.tight_layout()
-    plt.savefig(save_path)
-    plt.close()
+    return _grid_figure(heat, f'Ship Placement Heatmap - {lbl}', xlabel=None)
+
+def plot_ship_placement(df_ships, size=None, save_path="plot_heatmap_ships.png", user=None):
+    render_ship_placement(df_ships, size, user).savefig(save_path)
 
-def plot_turn_heatmaps(df_moves, max_turn=5):
+def plot_turn_heatmaps(df_moves, max_turn=5, user=None, result=None):
+    tensor = turn_tensor(df_moves, max_turn, user, result)
     for t in range(1, max_turn + 1):
-        subset = df_moves[df_moves['turn'] == t]
-        plot_heatmap(subset, title=f'Heatmap - Turn {t}', save_path=f"turn_{t}.png")
+        _plot_grid(tensor[t - 1], f'Heatmap - Turn {t}', f"turn_{t}.png")
 
 def user_specific(df_moves, df_ships, user_id):
     dm = df_moves[df_moves['user_id'] == user_id]
-    ds = df_ships[df_ships['user_id'] == user_id]
     plot_average_turns(dm, save_path=f"user_{user_id}_avg_turns.png")
     plot_heatmap(dm, title=f'Heatmap Moves - User {user_id}', save_path=f"user_{user_id}_heatmap.png")
-    plot_ship_placement(ds, save_path=f"user_{user_id}_ships.png")
-    for size in sorted(ds['size'].unique()):
-        plot_ship_placement(ds, size, save_path=f"user_{user_id}_ships_size_{size}.png")
+    heats = ship_heatmaps(df_ships, user_id)
+    all_ships = sum(heats.values()) if heats else np.zeros((10, 10), int)
+    _plot_grid(all_ships, 'Ship Placement Heatmap - All Ships', f"user_{user_id}_ships.png", xlabel=None)
+    for size, heat in sorted(heats.items()):
+        _plot_grid(heat, f'Ship Placement Heatmap - Size {size}',
+                   f"user_{user_id}_ships_size_{size}.png", xlabel=None)
 
 def compute_overall_stats(root_dir=LOGS_DIR):
-    df_moves, df_ships = load_logs(root_dir)
-    games = df_moves[['game_id', 'total_turns']].drop_duplicates()
-    avg_shots = games['total_turns'].mean()
-    win_counts = df_moves[df_moves['player'] == 1].groupby('game_id').first()['winner']
-    win_rate = (win_counts == 1).mean() * 100
+    agg = load_aggregates(root_dir)
+    if not agg["games"]:
+        return float('nan'), float('nan')
+    hist = agg["shots_per_game"]
+    avg_shots = sum(int(k) * n for k, n in hist.items()) / agg["games"]
+    win_rate = agg["wins"].get("1", 0) / agg["games"] * 100
     return avg_shots, win_rate
 
 def main():
@@ -6,12 +6,81 @@ from collections import defaultdict
 import pickle
 import numpy as np
 import random
-import matplotlib.pyplot as plt
+from operator import itemgetter
+from placements import placement_density
+from checkpoint import QTableJournal, atomic_write
+from game_store import GameStore
+from log_helper import flush_logs
+
+# Hücre başına 2 bit: U=0, M=1, H=2, S=3 -> 100 hücre 25 byte'lık anahtar
+STATE_CODES = str.maketrans("UMHS", "0123")
+STATE_BYTES = 25
+
+
+def _grid_digits(grid):
+    if not isinstance(grid, str):
+        try:
+            grid = "".join(grid)
+        except TypeError:
+            grid = "".join(np.array(grid).flatten().tolist())
+    return grid.translate(STATE_CODES)
+
+
+def _pack_digits(digits):
+    return int(digits, 4).to_bytes(STATE_BYTES, "big")
+
+
+def pack_state(grid):
+    """100 hücrelik search grid'i 25 byte'lık bytes anahtara paketler."""
+    return _pack_digits(_grid_digits(grid))
+
+
+def unpack_state(key):
+    digits = np.base_repr(int.from_bytes(key, "big"), 4).rjust(100, "0")
+    return ["UMHS"[int(d)] for d in digits]
+
+
+def _build_symmetries():
+    """10x10 tahtanın 8 dönme/yansıma permütasyonu; perm[j] = kanonik j hücresinin kaynağı."""
+    perms = []
+    for flip in (False, True):
+        for turns in range(4):
+            perm = []
+            for r in range(10):
+                for c in range(10):
+                    rr, cc = r, 9 - c if flip else c
+                    for _ in range(turns):
+                        rr, cc = cc, 9 - rr
+                    perm.append(rr * 10 + cc)
+            perms.append(tuple(perm))
+    return tuple(perms)
+
+
+SYMMETRIES = _build_symmetries()
+SYMMETRY_INVERSES = tuple(np.argsort(perm) for perm in SYMMETRIES)
+_SYMMETRY_GETTERS = tuple(itemgetter(*perm) for perm in SYMMETRIES)
+
+
+def canonical_state(grid):
+    """
+    Tahtanın 8 simetrisinden paketli anahtarı en küçük olanı seçer.
+    (anahtar, simetri no) döndürür; kanonik grid c[j] = grid[SYMMETRIES[t][j]].
+    """
+    source = best = _grid_digits(grid)
+    best_t = 0
+    for t in range(1, 8):
+        digits = "".join(_SYMMETRY_GETTERS[t](source))
+        if digits < best:
+            best, best_t = digits, t
+    return _pack_digits(best), best_t
+
 
 class QLearningAgent:
     def __init__(
         self, user_id, alpha=0.3, gamma=0.9, epsilon=0.5,
-        min_epsilon=0.05, decay=0.99, model_filename="qtable.pkl"
+        min_epsilon=0.05, decay=0.99, model_filename="qtable.pkl", targeter=None,
+        learn=True, value_dtype=np.float32, symmetric=False, storage="pickle",
+        journal=False, checkpoint_updates=10000, checkpoint_seconds=300.0, load=True
     ):
         self.user_id = user_id
         self.alpha = alpha
@@ -20,34 +89,125 @@ class QLearningAgent:
         self.min_epsilon = min_epsilon
         self.decay = decay
         self.ship_sizes = [5, 4, 3, 3, 2]
+        self.value_dtype = value_dtype
+        # True ise simetrik tahtalar tek bir kanonik state'i paylaşır
+        self.symmetric = symmetric
         self.q_table = defaultdict(self._default_q)
         self.target_queue = []
+        # Hedef modunda kullanılacak opsiyonel motor (ör. targeting.MonteCarloTargeter)
+        self.targeter = targeter
 
         self.user_dir = Path("logs") / self.user_id
         self.user_dir.mkdir(parents=True, exist_ok=True)
+        # "pickle": tüm tablo belleğe yüklenir; "mmap": qtable_store.MappedQTable
+        self.storage = storage
         self.q_file = self.user_dir / model_filename
-
+        if storage == "mmap":
+            self.q_file = self.q_file.with_suffix(".qtb")
+        # Opsiyonel delta günlüğü: update_q değişiklikleri sürekli diske eklenir
+        self.journal = None
+        if journal:
+            if storage == "mmap":
+                raise ValueError("journal sadece pickle depolama ile kullanılabilir")
+            self.journal = QTableJournal(self.q_file.with_suffix(".journal"),
+                                         checkpoint_updates, checkpoint_seconds)
+
+        # load=False: tablo sonradan load() ile (ör. arka planda) yüklenir
+        if load:
+            self.load(learn)
+
+    def load(self, learn=True):
+        """Q-table'ı diskten yükler; learn=True ise henüz işlenmemiş logları öğrenir."""
         self._load_q_table()
-        self.learn_from_logs()
+        if learn:
+            self.learn_from_logs()
 
     def _default_q(self):
-        return np.zeros(100)
+        return np.zeros(100, self.value_dtype)
 
     def _load_q_table(self):
-        if self.q_file.exists() and self.q_file.stat().st_size > 0:
+        if self.storage == "mmap":
+            self._open_mapped_table()
+            return
+        self.q_table = defaultdict(self._default_q, self._read_pickle(self.q_file))
+        if self.journal is not None:
+            self.journal.replay(self.q_table)
+
+    def _read_pickle(self, path):
+        if path.exists() and path.stat().st_size > 0:
             try:
-                with open(self.q_file, 'rb') as f:
-                    data = pickle.load(f)
-                self.q_table = defaultdict(self._default_q, data)
+                with open(path, 'rb') as f:
+                    return self._migrate(pickle.load(f))
             except Exception:
-                self.q_table = defaultdict(self._default_q)
+                pass
+        return {}
+
+    def _open_mapped_table(self):
+        from qtable_store import MappedQTable, write_table
+        if not self.q_file.exists():
+            # İlk açılışta varsa eski pickle tablosunu ikili formata taşı
+            legacy = self._read_pickle(self.q_file.with_suffix(".pkl"))
+            if legacy:
+                write_table(self.q_file, legacy, self.value_dtype, self.symmetric)
+        self.q_table = MappedQTable(self.q_file, self.value_dtype, self.symmetric)
+        if self.q_table.symmetric != self.symmetric:
+            print(f"Uyarı: {self.q_file} symmetric={self.q_table.symmetric} ile kaydedilmiş")
+
+    def _migrate(self, data):
+        """Eski tuple anahtarlı / float64 pickle'ları paketli anahtar ve value_dtype'a çevirir."""
+        symmetric = False
+        if data.get("format") == 2:
+            keys, values = data["keys"], data["values"].astype(self.value_dtype, copy=False)
+            symmetric = data.get("symmetric", False)
+            migrated = {keys[i * STATE_BYTES:(i + 1) * STATE_BYTES]: values[i]
+                        for i in range(len(values))}
+        else:
+            migrated = {}
+            for state, values in data.items():
+                key = state if isinstance(state, bytes) else pack_state(state)
+                migrated[key] = np.asarray(values, dtype=self.value_dtype)
+        if self.symmetric and not symmetric:
+            migrated = self._canonicalize_table(migrated)
+        elif symmetric and not self.symmetric:
+            print(f"Uyarı: {self.q_file} simetrik kaydedilmiş; symmetric=True ile açılmalı")
+        return migrated
+
+    def _canonicalize_table(self, table):
+        """Yönlü state'leri kanonik anahtarlara taşır; çakışmada ilk satır kalır."""
+        canonical = {}
+        for key, values in table.items():
+            ckey, t = canonical_state(unpack_state(key))
+            if ckey not in canonical:
+                canonical[ckey] = np.asarray(values)[list(SYMMETRIES[t])]
+        return canonical
 
     def save(self):
-        with open(self.q_file, 'wb') as f:
-            pickle.dump(dict(self.q_table), f)
+        if self.storage == "mmap":
+            self.q_table.flush()
+            return
+        # Tek bir anahtar bloğu + (state, 100) değer matrisi: dizi başına pickle yükü yok
+        keys = list(self.q_table)
+        values = np.array([self.q_table[k] for k in keys], dtype=self.value_dtype).reshape(-1, 100)
+        data = {"format": 2, "symmetric": self.symmetric, "keys": b"".join(keys), "values": values}
+        atomic_write(self.q_file, lambda f: pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL))
+        if self.journal is not None:
+            self.journal.reset()
+
+    def _state(self, grid):
+        """(anahtar, ters permütasyon) döndürür; simetri kapalıysa permütasyon None."""
+        if not self.symmetric:
+            return pack_state(grid), None
+        key, t = canonical_state(grid)
+        return key, SYMMETRY_INVERSES[t]
 
     def state_from_grid(self, grid):
-        return tuple(np.array(grid).flatten().tolist())
+        return self._state(grid)[0]
+
+    def q_values(self, grid):
+        """grid'in kendi yönelimindeki 100 aksiyonun Q değerleri."""
+        key, inverse = self._state(grid)
+        row = self.q_table[key]
+        return row if inverse is None else row[inverse]
 
     def get_neighbors(self, idx):
         row, col = divmod(idx, 10)
@@ -59,29 +219,27 @@ class QLearningAgent:
         return neighbors
 
     def compute_probability_grid(self, search_grid):
-        prob = np.zeros((10,10))
-        for size in self.ship_sizes:
-            for r in range(10):
-                for c in range(10 - size + 1):
-                    indices = [r*10 + c + i for i in range(size)]
-                    if all(search_grid[i] == 'U' for i in indices):
-                        for i in indices:
-                            prob.flat[i] += 1
-            for c in range(10):
-                for r in range(10 - size + 1):
-                    indices = [(r + i)*10 + c for i in range(size)]
-                    if all(search_grid[i] == 'U' for i in indices):
-                        for i in indices:
-                            prob.flat[i] += 1
-        total = prob.sum()
-        return prob.flatten()/total if total > 0 else prob.flatten()
-
-    def choose_action(self, search_grid):
+        return self.compute_probability_grids([search_grid])[0]
+
+    def compute_probability_grids(self, search_grids):
+        """Birden çok search grid'i tek seferde puanlar; (B, 100) olasılık döndürür."""
+        unknown = np.array([list(g) for g in search_grids]) == 'U'
+        prob = placement_density(unknown, self.ship_sizes).astype(float)
+        total = prob.sum(axis=1, keepdims=True)
+        return np.divide(prob, total, out=prob, where=total > 0)
+
+    def choose_action(self, search_grid, density=None):
         unk = [i for i, v in enumerate(search_grid) if v == 'U']
         if not unk:
             return None
 
         hits = [i for i, v in enumerate(search_grid) if v == 'H']
+        if hits and self.targeter is not None:
+            action = self.targeter.choose(search_grid)
+            if action is not None:
+                self._decay_epsilon()
+                return action
+
         if len(hits) >= 2:
             hits.sort()
             delta = abs(hits[1] - hits[0])
@@ -107,7 +265,10 @@ class QLearningAgent:
             self._decay_epsilon()
             return self.target_queue.pop(0)
 
-        probs = self.compute_probability_grid(search_grid)
+        if density is not None:
+            probs = density.probabilities()
+        else:
+            probs = self.compute_probability_grid(search_grid)
         p_unk = [probs[i] for i in unk]
         tot = sum(p_unk)
         if tot > 0:
@@ -117,8 +278,7 @@ class QLearningAgent:
             if random.random() < self.epsilon:
                 return random.choice(unk)
             else:
-                state = self.state_from_grid(search_grid)
-                qv = self.q_table[state]
+                qv = self.q_values(search_grid)
                 maxq = max(qv[i] for i in unk)
                 best = [i for i in unk if qv[i] == maxq]
                 return random.choice(best)
@@ -127,73 +287,141 @@ class QLearningAgent:
         self.epsilon = max(self.min_epsilon, self.epsilon * self.decay)
 
     def update_q(self, prev_grid, action, reward, next_grid):
-        s = self.state_from_grid(prev_grid)
+        s, inverse = self._state(prev_grid)
         ns = self.state_from_grid(next_grid)
+        if inverse is not None:
+            action = inverse[action]
         best_next = np.max(self.q_table[ns])
-        old = self.q_table[s][action]
-        self.q_table[s][action] = old + self.alpha * (reward + self.gamma * best_next - old)
-
-    def learn_from_logs(self):
-        """Ayrı ayrı game_*.json dosyalarından öğrenme yapar"""
+        row = self.q_table[s]
+        old = row[action]
+        row[action] = old + self.alpha * (reward + self.gamma * best_next - old)
+        if self.journal is not None:
+            self.journal.record(s, int(action), float(row[action]))
+            if self.journal.due():
+                self.save()
+
+    def learn_from_logs(self, rebuild=False):
+        """
+        game_*.json dosyalarından ve JSONL deposundan öğrenme yapar. İşlenen
+        dosyalar boyut/mtime ile ingest_manifest.json'da tutulur; oyun dosyaları
+        değişmez kabul edilir ve bir kez öğrenilir. Depo, manifestte saklanan
+        konumdan devam edilerek okunur. rebuild=True Q-table'ı sıfırdan eğitir.
+        """
         if not self.user_dir.exists():
             return
+        # Arka plan yazıcısında bekleyen oyunlar yarım okunmasın
+        flush_logs()
 
         # Kullanıcının tüm oyun dosyalarını bul
-        game_files = list(self.user_dir.glob("game_*.json"))
-        if not game_files:
+        game_files = sorted(self.user_dir.glob("game_*.json"))
+        store = GameStore(self.user_dir)
+        if not game_files and not store.exists():
             print(f"{self.user_dir} dizininde oyun dosyası bulunamadı")
             return
 
+        manifest_file = self.user_dir / "ingest_manifest.json"
+        if rebuild:
+            self.q_table.clear()
+            manifest = {}
+        else:
+            manifest = self._load_manifest(manifest_file)
+
+        processed = 0
         for game_file in game_files:
+            # Manifestteki dosya değişmiş olsa bile tekrar uygulanmaz: eski
+            # güncellemeler geri alınamadığından hamleler iki kez sayılırdı.
+            # Değişen logları öğrenmek için rebuild=True kullanılır.
+            if game_file.name in manifest:
+                continue
+            stat = game_file.stat()
             try:
                 with open(game_file, 'r', encoding='utf-8') as f:
                     game_data = json.load(f)
 
-                # Sadece bu kullanıcının verilerini işle
-                if game_data.get('user_id') != self.user_id:
-                    continue
-
-                self._process_game_data(game_data)
+                # Sadece bu kullanıcının verilerini işle (ID ya da kullanıcı adı)
+                if self.user_id in (game_data.get('user_id'), game_data.get('username')):
+                    self._process_game_data(game_data)
+                    processed += 1
 
             except Exception as e:
                 print(f"{game_file} işlenirken hata: {e}")
+                continue
+            # stored: bu oyunun depo kaydı henüz görülmedi (görülünce atlanacak)
+            manifest[game_file.name] = {"size": stat.st_size, "mtime": stat.st_mtime,
+                                        "game_id": game_data.get('game_id'), "stored": False}
+
+        # Dosyasından öğrenilmiş oyunların depo kayıtları birer kez atlanır
+        from_files = {}
+        for name, seen in manifest.items():
+            if isinstance(seen, dict) and not seen.get("stored"):
+                from_files.setdefault(seen.get("game_id"), []).append(name)
+
+        # JSONL deposundaki yeni kayıtlar (akıtarak). compact() kayıt sırasını
+        # koruyup sadece yinelenen indeks satırlarını attığından konum kırpılır.
+        entries = list(store.entries())
+        position = min(manifest.get("__store__", 0), len(entries))
+        for game_id, segment, offset, length in entries[position:]:
+            names = from_files.get(game_id)
+            if names:
+                manifest[names.pop()]["stored"] = True
+                continue
+            game_data = store.read(segment, offset, length)
+            if self.user_id in (game_data.get('user_id'), game_data.get('username')):
+                self._process_game_data(game_data)
+                processed += 1
+            # Oyun dosyası sonradan okunabilir hâle gelirse tekrar öğrenilmesin
+            manifest.setdefault(f"game_{game_id}.json", {"game_id": game_id, "stored": True})
+        manifest["__store__"] = len(entries)
+
+        if processed or rebuild:
+            self.save()
+        atomic_write(manifest_file, lambda f: f.write(json.dumps(manifest).encode("utf-8")))
+        print(f"Q-table güncellendi (İşlenen yeni oyun sayısı: {processed})")
+
+    def _load_manifest(self, manifest_file):
+        if manifest_file.exists():
+            try:
+                with open(manifest_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except Exception:
+                pass
+        return {}
+
+    def _process_game_data(self, game_data):
+        """Tek bir oyun verisini işler"""
+        grid = ['U'] * 100
+        for move in game_data.get('moves', []):
+            if move.get('player') != 1:  # Sadece AI hamleleri
+                continue
+
+            idx = move['cell']['row'] * 10 + move['cell']['col']
+            prev_grid = grid.copy()
+            result = move.get('result')
+
+            # Grid ve ödülü güncelle
+            if result in ('hit', 'sunk'):
+                grid[idx] = 'H'
+                reward = 3 if result == 'sunk' else 1
+            else:
+                grid[idx] = 'M'
+                reward = -0.1
+
+            # Q-tablosunu güncelle
+            self.update_q(prev_grid, idx, reward, grid)
 
-        self.save()
-        print(f"Q-table güncellendi (İşlenen oyun sayısı: {len(game_files)})")
-
-        def _process_game_data(self, game_data):
-            """Tek bir oyun verisini işler"""
-            grid = ['U'] * 100
-            for move in game_data.get('moves', []):
-                if move.get('player') != 1:  # Sadece AI hamleleri
-                    continue
-
-                idx = move['cell']['row'] * 10 + move['cell']['col']
-                prev_grid = grid.copy()
-                result = move.get('result')
-
-                # Grid ve ödülü güncelle
-                if result in ('hit', 'sunk'):
-                    grid[idx] = 'H'
-                    reward = 3 if result == 'sunk' else 1
-                else:
-                    grid[idx] = 'M'
-                    reward = -0.1
-
-                # Q-tablosunu güncelle
-                self.update_q(prev_grid, idx, reward, grid)
-
-                # Gemi batırıldıysa ek ödül
-                if result == 'sunk':
-                    self._reward_sunken_ship(prev_grid, grid, move)
-
-        def _reward_sunken_ship(self, prev_grid, grid, move):
-            """Batırılan gemi için ek ödül verir"""
-            ship_size = move.get('ship_size', 0)
-            for _ in range(ship_size):
-                self.update_q(prev_grid, idx, 5, grid)
+            # Gemi batırıldıysa ek ödül
+            if result == 'sunk':
+                self._reward_sunken_ship(prev_grid, grid, move, idx)
+
+    def _reward_sunken_ship(self, prev_grid, grid, move, idx):
+        """Batırılan gemi için ek ödül verir"""
+        ship_size = move.get('ship_size', 0)
+        for _ in range(ship_size):
+            self.update_q(prev_grid, idx, 5, grid)
 
     def plot_qtable_heatmap(self, search_grid, save_path="plot_qtable_heatmap.png"):
+        import matplotlib.pyplot as plt
+
         # Önce Q-tablosunu güncelle
         self.learn_from_logs()
 
@@ -205,7 +433,7 @@ class QLearningAgent:
             print(f"Uyarı: Current state Q-table'da bulunamadı!")
             q_values = np.zeros(100)
         else:
-            q_values = self.q_table[current_state]
+            q_values = self.q_values(search_grid)
 
         # Heatmap oluştur
         heat = np.array(q_values).reshape((10, 10))
@@ -235,51 +463,61 @@ class QLearningAgent:
         print(f"Toplam state sayısı: {len(self.q_table)}")
         if self.q_table:
             sample_state = next(iter(self.q_table))
-            print(f"Örnek state: {sample_state}")
+            print(f"Örnek state: {''.join(unpack_state(sample_state))}")
             print(f"Örnek Q değerleri: {self.q_table[sample_state]}")
         print(f"Epsilon değeri: {self.epsilon}")
 
-    def plot_aggregated_qtable(self, save_path="plot_qtable_heatmap.png"):
-        """Önceki heatmap'i silip yeni bir tane oluşturur."""
-        import os
-        import numpy as np
-        import matplotlib.pyplot as plt
-
-        # Eski dosyayı sil
-        if os.path.exists(save_path):
-            try:
-                os.remove(save_path)
-                print(f"Eski heatmap silindi: {save_path}")
-            except Exception as e:
-                print(f"Dosya silinemedi: {e}")
+    def render_aggregated_qtable(self):
+        """
+        Q-table'ı loglardan günceller ve ortalama Q değerlerini bir Figure'a çizer
+        (pyplot kullanmaz, arka plan iş parçacığından çağrılabilir). Tablo boşsa None.
+        """
+        from matplotlib.figure import Figure
 
         # Q-table'ı güncelle
         self.learn_from_logs()
 
         if not self.q_table:
             print("Uyarı: Q-table boş! Önce oyun verisi gerekiyor.")
-            return
+            return None
 
         # Tüm Q değerlerinin ortalamasını hesapla
         q_values = np.mean(list(self.q_table.values()), axis=0)  # Düzeltme burada
         heatmap_data = q_values.reshape((10, 10))
 
         # Heatmap oluştur
-        plt.figure(figsize=(10, 8))
-        heatmap = plt.imshow(
+        fig = Figure(figsize=(10, 8))
+        ax = fig.add_subplot()
+        heatmap = ax.imshow(
             heatmap_data,  # Düzeltilmiş veri
             cmap="viridis",
             interpolation="nearest",
             origin="upper"
         )
-        plt.colorbar(heatmap, label="Q Değeri")
-        plt.title(f"Güncel Q-Table Heatmap (Kullanıcı: {self.user_id})")
+        fig.colorbar(heatmap, ax=ax, label="Q Değeri")
+        ax.set_title(f"Güncel Q-Table Heatmap (Kullanıcı: {self.user_id})")
 
         # Eksen etiketleri
-        plt.xticks(range(10))
-        plt.yticks(range(10))
+        ax.set_xticks(range(10))
+        ax.set_yticks(range(10))
 
-        plt.tight_layout()
-        plt.savefig(save_path)
-        plt.close()
+        fig.tight_layout()
+        return fig
+
+    def plot_aggregated_qtable(self, save_path="plot_qtable_heatmap.png"):
+        """Önceki heatmap'i silip yeni bir tane oluşturur."""
+        import os
+
+        # Eski dosyayı sil
+        if os.path.exists(save_path):
+            try:
+                os.remove(save_path)
+                print(f"Eski heatmap silindi: {save_path}")
+            except Exception as e:
+                print(f"Dosya silinemedi: {e}")
+
+        fig = self.render_aggregated_qtable()
+        if fig is None:
+            return
+        fig.savefig(save_path)
         print(f"Yeni heatmap oluşturuldu: {save_path}")
\ No newline at end of file
@@ -0,0 +1,100 @@
+# ai_worker.py
+"""
+AI hamlelerini çizim döngüsünün dışında hesaplayan işçi.
+
+Ana döngü her hamle için search grid'in değişmez bir kopyasını (tuple) ve
+yoğunluk olasılıklarının dondurulmuş hâlini gönderir, sonucu her karede yoklar.
+Hamle süre sınırı (deadline) içinde gelmezse yedek hamle oynanır; geç gelen
+sonuç atılır. choose_action ve update_q aynı tek iş parçacığında sırayla
+çalıştığı için ajan durumuna tek bir yerden dokunulur.
+"""
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
+
+
+class FrozenDensity:
+    """DensityTracker.probabilities() çıktısının değişmez kopyası."""
+
+    def __init__(self, probs):
+        self._probs = tuple(probs)
+
+    def probabilities(self):
+        return list(self._probs)
+
+
+def fallback_move(search):
+    """Süre aşımında oynanan ucuz hamle: önce isabetlerin komşuları, yoksa rastgele."""
+    unknown = [i for i, v in enumerate(search) if v == "U"]
+    if not unknown:
+        return None
+    near = []
+    for i, v in enumerate(search):
+        if v == "H":
+            r, c = divmod(i, 10)
+            for n in (i - 10 if r > 0 else -1, i + 10 if r < 9 else -1,
+                      i - 1 if c > 0 else -1, i + 1 if c < 9 else -1):
+                if n >= 0 and search[n] == "U":
+                    near.append(n)
+    return random.choice(near or unknown)
+
+
+class AIMoveWorker:
+    def __init__(self, agent, lock=None, deadline=0.25):
+        self.agent = agent
+        self.lock = lock or threading.Lock()
+        self.deadline = deadline
+        self.timeouts = 0
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ai-move")
+        self._pending = None
+        self._key = None
+        self._expires = 0.0
+
+    def _choose(self, search, density):
+        with self.lock:
+            return self.agent.choose_action(search, density)
+
+    def _learn(self, prev, action, reward, nxt):
+        with self.lock:
+            self.agent.update_q(prev, action, reward, nxt)
+
+    def move(self, key, search, density=None, wait=0.0):
+        """
+        key (ör. (oyun, atış sayısı)) için hamleyi döndürür: (hazır mı, hamle).
+        Aynı key için ilk çağrı işi başlatır; key değiştiyse eski iş yok sayılır.
+        wait > 0 ise sonuç için en fazla o kadar saniye beklenir.
+        """
+        if self._pending is None or self._key != key:
+            if self._pending is not None:
+                self._pending.cancel()  # henüz başlamadıysa kuyrukta birikmesin
+            frozen = FrozenDensity(density.probabilities()) if density is not None else None
+            self._key = key
+            self._pending = self._pool.submit(self._choose, tuple(search), frozen)
+            self._expires = time.perf_counter() + self.deadline
+        if not self._pending.done() and wait > 0:
+            wait_futures([self._pending], timeout=min(wait, self.deadline))
+        if self._pending.done():
+            future, self._pending = self._pending, None
+            try:
+                action = future.result()
+            except Exception as e:
+                print(f"AI hamlesi hesaplanamadı: {e}")
+                action = None
+            if action is None or search[action] != "U":
+                action = fallback_move(search)
+            return True, action
+        if time.perf_counter() >= self._expires:
+            self._pending.cancel()
+            self._pending = None
+            self.timeouts += 1
+            return True, fallback_move(search)
+        return False, None
+
+    def learn(self, prev, action, reward, nxt):
+        """update_q'yu sıradaki hamle hesabından önce işçide çalıştırır."""
+        self._pool.submit(self._learn, prev, action, reward, nxt)
+
+    def close(self):
+        self._pending = None
+        self._pool.shutdown(wait=True)
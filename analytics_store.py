@@ -0,0 +1,151 @@
+# analytics_store.py
+"""
+Kullanıcı başına ve genel kalıcı analiz özetleri (aggregates.json).
+
+    LOGS_DIR/<kullanıcı>/aggregates.json   kullanıcının oyunları
+    LOGS_DIR/aggregates.json               tüm kullanıcılar
+
+Her oyun bittiğinde (log yazıcısında) özetler oyunun kendi hamleleriyle
+güncellenir; geçmiş oyunlar yeniden okunmaz. verify/rebuild komutları özetleri
+loglardan baştan hesaplayıp kayma (drift) olup olmadığını denetler.
+"""
+import argparse
+import json
+from pathlib import Path
+
+from checkpoint import atomic_write
+from game_store import iter_user_games
+
+AGGREGATE_FILE = "aggregates.json"
+VERSION = 1
+
+
+def empty():
+    return {
+        "version": VERSION,
+        "games": 0,
+        "shots": [0] * 100,          # tüm atışlar, hücre başına
+        "hits": [0] * 100,           # isabet + batırma
+        "placements": {},            # {"boyut": [100]}
+        "shots_per_game": {},        # {"toplam atış": oyun sayısı}
+        "wins": {"0": 0, "1": 0, "2": 0},
+    }
+
+
+def add_game(agg, log_data):
+    """Tek bir oyun logunu özete ekler."""
+    agg["games"] += 1
+    shots, hits = agg["shots"], agg["hits"]
+    for mv in log_data.get("moves", []):
+        cell = mv.get("cell") or {}
+        if cell.get("row") is None or cell.get("col") is None:
+            continue
+        i = cell["row"] * 10 + cell["col"]
+        shots[i] += 1
+        if mv.get("result") in ("hit", "sunk"):
+            hits[i] += 1
+    for label in ("player1_ships", "player2_ships"):
+        for ship in log_data.get(label, []):
+            counts = agg["placements"].setdefault(str(ship.get("size")), [0] * 100)
+            for i in ship.get("cells", []):
+                counts[i] += 1
+    total = str(log_data.get("total_turns") or len(log_data.get("moves", [])))
+    agg["shots_per_game"][total] = agg["shots_per_game"].get(total, 0) + 1
+    winner = str(log_data.get("winner") or 0)
+    agg["wins"][winner] = agg["wins"].get(winner, 0) + 1
+    return agg
+
+
+def path_for(root, user=None):
+    root = Path(root)
+    return (root / user if user else root) / AGGREGATE_FILE
+
+
+def load(root, user=None):
+    """Kayıtlı özeti okur; yoksa loglardan bir kez kurup kaydeder."""
+    path = path_for(root, user)
+    if path.exists():
+        with open(path, encoding="utf-8") as f:
+            agg = json.load(f)
+        if agg.get("version") == VERSION:
+            return agg
+    agg = compute(root, user)
+    save(agg, path)
+    return agg
+
+
+def save(agg, path):
+    data = json.dumps(agg, separators=(",", ":")).encode("utf-8")
+    atomic_write(path, lambda f: f.write(data))
+
+
+def update(user_dir, logs):
+    """
+    Yeni yazılmış oyunları kullanıcı ve genel özetlere ekler. Özet dosyası hiç
+    yoksa depoda zaten olan oyunlardan (bu oyunlar dahil) baştan kurulur.
+    """
+    user_dir = Path(user_dir)
+    root = user_dir.parent
+    for path, user in ((path_for(root, user_dir.name), user_dir.name), (path_for(root), None)):
+        if not path.exists():
+            save(compute(root, user), path)
+            continue
+        with open(path, encoding="utf-8") as f:
+            agg = json.load(f)
+        for log_data in logs:
+            add_game(agg, log_data)
+        save(agg, path)
+
+
+def compute(root, user=None):
+    """Özeti loglardan baştan hesaplar."""
+    root = Path(root)
+    agg = empty()
+    user_dirs = [root / user] if user else sorted(p for p in root.iterdir() if p.is_dir())
+    for user_dir in user_dirs:
+        if user_dir.is_dir():
+            for log_data in iter_user_games(user_dir):
+                add_game(agg, log_data)
+    return agg
+
+
+def _users(root):
+    return sorted(p.name for p in Path(root).iterdir() if p.is_dir())
+
+
+def verify(root):
+    """Kayıtlı özetleri loglarla karşılaştırır; tutmayanların adlarını döndürür."""
+    drifted = []
+    for user in _users(root) + [None]:
+        path = path_for(root, user)
+        stored = json.loads(path.read_text(encoding="utf-8")) if path.exists() else empty()
+        if stored != compute(root, user):
+            drifted.append(user or "<genel>")
+    return drifted
+
+
+def rebuild(root):
+    for user in _users(root) + [None]:
+        save(compute(root, user), path_for(root, user))
+
+
+def main(argv=None):
+    from log_helper import LOGS_DIR
+
+    parser = argparse.ArgumentParser(description="Kalıcı analiz özetleri")
+    parser.add_argument("command", choices=("verify", "rebuild"))
+    parser.add_argument("root", nargs="?", default=LOGS_DIR)
+    args = parser.parse_args(argv)
+    if args.command == "rebuild":
+        rebuild(args.root)
+        print("Özetler yeniden kuruldu")
+        return
+    drifted = verify(args.root)
+    if drifted:
+        print("Tutarsız özetler: " + ", ".join(drifted))
+        raise SystemExit(1)
+    print("Tüm özetler loglarla tutarlı")
+
+
+if __name__ == "__main__":
+    main()
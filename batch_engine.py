@@ -0,0 +1,149 @@
+# batch_engine.py
+import numpy as np
+from placements import sample_fleets
+
+UNKNOWN, MISS, HIT, SUNK = 0, 1, 2, 3
+SEARCH_CHARS = np.array(["U", "M", "H", "S"])
+
+# basic_ai'deki (u//10 + u%10) % 2 == 0 dama deseni
+CHECKER = np.array([(i // 10 + i % 10) % 2 == 0 for i in range(100)])
+
+
+class BatchGame:
+    """
+    N oyunu aynı anda (N, 100) dizilerde tutar; her adımda oyun başına
+    bir atış vektörel olarak uygulanır. Kurallar Game.make_move ile aynıdır:
+    isabette sıra aynı oyuncuda kalır, gemi tamamen vurulunca hücreleri 'S'
+    olur, rakibin tüm gemileri vurulunca oyun biter.
+    """
+
+    def __init__(self, n_games, sizes=(5, 4, 3, 3, 2), seed=None):
+        self.n = n_games
+        self.sizes = list(sizes)
+        self.rng = np.random.default_rng(seed)
+        # ships[g, p, i]: p oyuncusunun i hücresindeki gemi numarası (0 = boş)
+        self.ships = np.zeros((n_games, 2, 100), np.int8)
+        # search[g, p, i]: p oyuncusunun rakip tahtası hakkında bildiği
+        self.search = np.zeros((n_games, 2, 100), np.int8)
+        # remaining[g, p, k]: p oyuncusunun k numaralı gemisinin vurulmamış hücreleri
+        self.remaining = np.zeros((n_games, 2, len(self.sizes) + 1), np.int8)
+        self.player1_turn = np.ones(n_games, bool)
+        self.over = np.zeros(n_games, bool)
+        self.result = np.zeros(n_games, np.int8)
+        self.n_shots = np.zeros(n_games, np.int32)
+        self._place_fleets()
+
+    def _place_fleets(self):
+        fleets = sample_fleets(2 * self.n, self.sizes, self.rng)
+        self.ships[:] = fleets.reshape(self.n, 2, 100)
+        self.remaining[:, :, 1:] = self.sizes
+
+    @property
+    def current_player(self):
+        return np.where(self.player1_turn, 0, 1)
+
+    @property
+    def current_search(self):
+        return self.search[np.arange(self.n), self.current_player]
+
+    def search_view(self, g, player=None):
+        """Tek bir oyunun search grid'ini Game.current_search biçiminde döndürür."""
+        p = (0 if self.player1_turn[g] else 1) if player is None else player - 1
+        return SEARCH_CHARS[self.search[g, p]].tolist()
+
+    def step(self, actions):
+        """Her aktif oyunda actions[g] hücresine ateş eder (-1 = atış yok)."""
+        actions = np.asarray(actions)
+        idx = np.flatnonzero(~self.over & (actions >= 0))
+        p = np.where(self.player1_turn[idx], 0, 1)
+        a = actions[idx]
+        # Tekrar eden vuruşu engelle
+        fresh = self.search[idx, p, a] == UNKNOWN
+        idx, p, a = idx[fresh], p[fresh], a[fresh]
+        if not len(idx):
+            return
+        o = 1 - p
+        sid = self.ships[idx, o, a]
+        hit = sid > 0
+        self.search[idx, p, a] = np.where(hit, HIT, MISS)
+        self.n_shots[idx] += 1
+
+        hg, hp, ho, hs = idx[hit], p[hit], o[hit], sid[hit]
+        self.remaining[hg, ho, hs] -= 1
+        sunk = self.remaining[hg, ho, hs] == 0
+        if sunk.any():
+            sg, sp, so, ss = hg[sunk], hp[sunk], ho[sunk], hs[sunk]
+            rows = self.search[sg, sp]
+            rows[self.ships[sg, so] == ss[:, None]] = SUNK
+            self.search[sg, sp] = rows
+            # Oyun bitti mi? Sadece atış yapan oyuncunun durumu değişebilir
+            done = self.remaining[sg, so].sum(axis=1) == 0
+            self.over[sg[done]] = True
+            self.result[sg[done]] = sp[done] + 1
+
+        miss = idx[~hit]
+        self.player1_turn[miss] = ~self.player1_turn[miss]
+
+    def _choose(self, candidates):
+        keys = self.rng.random(candidates.shape)
+        keys[~candidates] = -1.0
+        actions = keys.argmax(axis=1)
+        actions[~candidates.any(axis=1) | self.over] = -1
+        return actions
+
+    def random_ai(self):
+        """Game.random_ai'nin vektörel hali: her oyun için rastgele bilinmeyen hücre."""
+        return self._choose(self.current_search == UNKNOWN)
+
+    def basic_ai(self):
+        """Game.basic_ai'nin vektörel hali: isabet komşusu, sonra dama, sonra rastgele."""
+        search = self.current_search
+        unknown = search == UNKNOWN
+        hits = search == HIT
+        # abs(u-h) in (1, 10) koşulu düz indeks üzerinde kaydırma ile
+        near = np.zeros_like(hits)
+        near[:, 1:] |= hits[:, :-1]
+        near[:, :-1] |= hits[:, 1:]
+        near[:, 10:] |= hits[:, :-10]
+        near[:, :-10] |= hits[:, 10:]
+        near &= unknown
+        checker = unknown & CHECKER
+        candidates = np.where(near.any(axis=1)[:, None], near,
+                              np.where(checker.any(axis=1)[:, None], checker, unknown))
+        return self._choose(candidates)
+
+    def play(self, strategy1="basic", strategy2="basic", max_steps=10000):
+        """Tüm oyunlar bitene kadar iki stratejiyi karşılaştırır."""
+        strategy1 = self._strategy(strategy1)
+        strategy2 = self._strategy(strategy2)
+        for _ in range(max_steps):
+            if self.over.all():
+                break
+            a1 = strategy1(self)
+            a2 = strategy2(self)
+            self.step(np.where(self.player1_turn, a1, a2))
+        return self.result, self.n_shots
+
+    @staticmethod
+    def _strategy(strategy):
+        if callable(strategy):
+            return strategy
+        return {"random": BatchGame.random_ai, "basic": BatchGame.basic_ai}[strategy]
+
+
+def play_tournament(n_games, strategy1="basic", strategy2="random", seed=None):
+    """İki yerleşik strateji arasında n_games oyunluk turnuva oynatır."""
+    batch = BatchGame(n_games, seed=seed)
+    result, n_shots = batch.play(strategy1, strategy2)
+    return {
+        "wins1": int((result == 1).sum()),
+        "wins2": int((result == 2).sum()),
+        "avg_shots": float(n_shots.mean()) if n_games else 0.0,
+        "n_shots": n_shots,
+    }
+
+
+if __name__ == "__main__":
+    stats = play_tournament(1000)
+    print(f"basic_ai Wins: {stats['wins1']}, random_ai Wins: {stats['wins2']}, "
+          f"Ortalama atış: {stats['avg_shots']:.1f}")
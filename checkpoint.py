@@ -0,0 +1,80 @@
+# checkpoint.py
+"""
+Q-table için önceden yazmalı (write-ahead) delta günlüğü.
+
+Her update_q sonrası (state, action, yeni değer) kaydı günlüğe eklenir.
+Periyodik tam anlık görüntü (snapshot) geçici dosyaya yazılıp atomik
+rename ile yerine konur ve günlük sıfırlanır. Yüklerken snapshot + günlük
+yeniden oynatılır. Kayıtlar mutlak değer taşıdığı için tekrar oynatmak
+güvenlidir; çökme sırasında yarım kalan son kayıt yok sayılır.
+"""
+import os
+import struct
+import time
+from pathlib import Path
+
+RECORD = struct.Struct("<25sBf")
+
+
+def atomic_write(path, write):
+    """write(f) ile geçici dosyaya yazar, fsync eder ve path'in yerine koyar."""
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class QTableJournal:
+    def __init__(self, path, checkpoint_updates=10000, checkpoint_seconds=300.0):
+        self.path = Path(path)
+        self.checkpoint_updates = checkpoint_updates
+        self.checkpoint_seconds = checkpoint_seconds
+        self.pending = 0
+        self.last_checkpoint = time.monotonic()
+        self._file = None
+
+    def record(self, key, action, value):
+        if self._file is None:
+            self._file = open(self.path, "ab")
+        self._file.write(RECORD.pack(key, action, value))
+        self._file.flush()
+        self.pending += 1
+
+    def due(self):
+        """Güncelleme sayısı veya süre eşiği aşıldıysa yeni snapshot zamanı gelmiştir."""
+        if not self.pending:
+            return False
+        if self.checkpoint_updates and self.pending >= self.checkpoint_updates:
+            return True
+        return bool(self.checkpoint_seconds) and \
+            time.monotonic() - self.last_checkpoint >= self.checkpoint_seconds
+
+    def replay(self, table):
+        """Günlükteki kayıtları table[key][action] = value olarak uygular."""
+        if not self.path.exists():
+            return 0
+        data = self.path.read_bytes()
+        n = len(data) // RECORD.size
+        if len(data) != n * RECORD.size:
+            # Yarım kalmış son kaydı at ki yeni kayıtlar hizalı eklensin
+            os.truncate(self.path, n * RECORD.size)
+        for key, action, value in RECORD.iter_unpack(data[:n * RECORD.size]):
+            table[key][action] = value
+        self.pending = n
+        return n
+
+    def reset(self):
+        """Snapshot diske yazıldıktan sonra çağrılır; günlüğü boşaltır."""
+        self.close()
+        with open(self.path, "wb"):
+            pass
+        self.pending = 0
+        self.last_checkpoint = time.monotonic()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
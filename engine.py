@@ -1,15 +1,24 @@
 # engine.py
 import random
-from log_helper import create_log_data, add_move, finalize_log, set_username
+from array import array
+from game_record import RESULT_CODES
+from log_helper import create_log_data, add_packed_moves, finalize_log, set_username
+from placements import PLACEMENTS, PLACEMENT_MASKS, DensityTracker
 
 class Ship:
-    def __init__(self, size):
+    def __init__(self, size, row=None, col=None, orientation=None):
         self.size = size
-        self.orientation = random.choice(["v", "h"])
-        self.row = random.randrange(0, 10)
-        self.col = random.randrange(0, 10)
+        self.orientation = random.choice(["v", "h"]) if orientation is None else orientation
+        self.row = random.randrange(0, 10) if row is None else row
+        self.col = random.randrange(0, 10) if col is None else col
         self.indexes = self.compute_indexes()
 
+    @classmethod
+    def from_cells(cls, cells):
+        row, col = divmod(cells[0], 10)
+        orientation = "h" if len(cells) < 2 or cells[1] - cells[0] == 1 else "v"
+        return cls(len(cells), row, col, orientation)
+
     def compute_indexes(self):
         if self.orientation == "h":
             if self.col + self.size > 10:
@@ -20,61 +29,181 @@ class Ship:
                 return []
             return [(self.row + i) * 10 + self.col for i in range(self.size)]
 
+class BitboardSearch:
+    """Bitboard maskelerinden okunan, liste uyumlu salt-okunur search görünümü."""
+
+    def __init__(self, player):
+        self.player = player
+
+    def __len__(self):
+        return 100
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(100))]
+        if index < 0:
+            index += 100
+        if not 0 <= index < 100:
+            raise IndexError("search index out of range")
+        bit = 1 << index
+        p = self.player
+        if p.sunk_mask & bit:
+            return "S"
+        if p.hit_mask & bit:
+            return "H"
+        if p.shot_mask & bit:
+            return "M"
+        return "U"
+
+    def __iter__(self):
+        return iter(self.tolist())
+
+    def __eq__(self, other):
+        return self.tolist() == list(other)
+
+    def __repr__(self):
+        return repr(self.tolist())
+
+    def tolist(self):
+        p = self.player
+        shot, hit, sunk = p.shot_mask, p.hit_mask, p.sunk_mask
+        out = []
+        for i in range(100):
+            bit = 1 << i
+            if not shot & bit:
+                out.append("U")
+            elif sunk & bit:
+                out.append("S")
+            elif hit & bit:
+                out.append("H")
+            else:
+                out.append("M")
+        return out
+
+    def copy(self):
+        return self.tolist()
+
+    def count(self, value):
+        p = self.player
+        if value == "U":
+            return 100 - bin(p.shot_mask).count("1")
+        if value == "M":
+            return bin(p.shot_mask & ~p.hit_mask).count("1")
+        if value == "H":
+            return bin(p.hit_mask & ~p.sunk_mask).count("1")
+        if value == "S":
+            return bin(p.sunk_mask).count("1")
+        return 0
+
+    def index(self, value):
+        for i, v in enumerate(self.tolist()):
+            if v == value:
+                return i
+        raise ValueError(f"{value!r} is not in search")
+
+
+def cells_to_mask(cells):
+    mask = 0
+    for i in cells:
+        mask |= 1 << i
+    return mask
+
+
 class Player:
-    def __init__(self, human=False):
+    def __init__(self, human=False, bitboard=False):
         self.human = human
+        self.bitboard = bitboard
         self.ships = []
-        self.search = ["U"] * 100
+        self.density = None
         self.place_ships([5, 4, 3, 3, 2])
         self.indexes = [i for ship in self.ships for i in ship.indexes]
+        if bitboard:
+            # Filo ve her gemi 100 bitlik maske; atış durumu da maskelerde tutulur
+            self.ship_masks = [cells_to_mask(ship.indexes) for ship in self.ships]
+            self.fleet_mask = cells_to_mask(self.indexes)
+            self.ship_at = [0] * 100
+            for mask, ship in zip(self.ship_masks, self.ships):
+                for i in ship.indexes:
+                    self.ship_at[i] = mask
+            self.shot_mask = 0
+            self.hit_mask = 0
+            self.sunk_mask = 0
+            self.search = BitboardSearch(self)
+        else:
+            self.search = ["U"] * 100
 
     def place_ships(self, sizes):
+        # Sadece çakışmayan geçerli yerleşimler arasından seç; tekrar deneme yok
+        occupied = 0
         for size in sizes:
-            placed = False
-            while not placed:
-                ship = Ship(size)
-                if not ship.indexes or any(i >= 100 for i in ship.indexes):
-                    continue
-                if ship.orientation == "h" and any(i // 10 != ship.row for i in ship.indexes):
-                    continue
-                if ship.orientation == "v" and any(i % 10 != ship.col for i in ship.indexes):
-                    continue
-                if any(i in prev for prev in [s.indexes for s in self.ships] for i in ship.indexes):
-                    continue
-                self.ships.append(ship)
-                placed = True
+            masks = PLACEMENT_MASKS[size]
+            options = [p for p, mask in enumerate(masks) if not mask & occupied]
+            p = random.choice(options)
+            occupied |= masks[p]
+            self.ships.append(Ship.from_cells(PLACEMENTS[size][p]))
+
+# Bir oyunda en fazla 2 * 100 atış yapılabilir
+MAX_MOVES = 200
+
 
 class Game:
-    def __init__(self, human1=False, human2=False, username=None):
+    def __init__(self, human1=False, human2=False, username=None, bitboard=False,
+                 track_density=False, log=True):
         # Kullanıcı adı verildiyse set et
         if username:
             set_username(username)
         self.human1 = human1
         self.human2 = human2
-        self.player1 = Player(human1)
-        self.player2 = Player(human2)
-        # Log oluştur
+        self.bitboard = bitboard
+        self.player1 = Player(human1, bitboard=bitboard)
+        self.player2 = Player(human2, bitboard=bitboard)
+        if track_density:
+            self.track_density()
+        # Log oluştur (log=False ise simülasyon için tamamen kapalı)
         self.log = create_log_data(
             player1_ships=self.player1.ships,
             player2_ships=self.player2.ships
-        )
+        ) if log else None
+        # Hamleler game_record biçiminde paketlenmiş uint16 olarak önceden ayrılmış
+        # tampona yazılır; JSON hamle listesi sadece finalize veya move_log'da kurulur
+        self.moves = array("H", bytes(2 * MAX_MOVES)) if log else None
         self.player1_turn = True
         self.computer_turn = not human1 or not human2
         self.over = False
         self.result = None
         self.n_shots = 0
 
+    def move_log(self):
+        """Tampondaki hamleleri log sözlüğüne aktarır (log kapalıysa None)."""
+        if self.log is None:
+            return None
+        done = len(self.log["moves"])
+        add_packed_moves(self.log, self.moves[done:self.n_shots], first_turn=done + 1)
+        return self.log
+
     @property
     def current_search(self):
         return self.player1.search if self.player1_turn else self.player2.search
 
+    @property
+    def current_density(self):
+        return self.player1.density if self.player1_turn else self.player2.density
+
+    def track_density(self, ship_sizes=(5, 4, 3, 3, 2)):
+        """Her oyuncunun search grid'ine artımlı bir DensityTracker bağlar."""
+        for player in (self.player1, self.player2):
+            player.density = DensityTracker(ship_sizes, search=player.search)
+
     @property
     def opponent(self):
         return self.player2 if self.player1_turn else self.player1
 
     def make_move(self, index):
+        """Atışı yapar; "miss" / "hit" / "sunk" döndürür, geçersiz atışta None."""
         if self.over:
             return
+        if self.bitboard:
+            return self._make_move_bitboard(index)
         player = self.player1 if self.player1_turn else self.player2
         opponent = self.player2 if self.player1_turn else self.player1
         # Tekrar eden vuruşu engelle
@@ -95,29 +224,88 @@ class Game:
             player.search[index] = "M"
             result = "miss"
         self.n_shots += 1
-        add_move(self.log, turn=self.n_shots, player=1 if self.player1_turn else 2,
-                 index=index, result=result, ship_size=None)
+        if player.density is not None:
+            player.density.resolve(index)
+        if self.moves is not None:
+            self.moves[self.n_shots - 1] = \
+                index | (0 if self.player1_turn else 0x80) | RESULT_CODES[result] << 8
         # Oyun bitti mi?
         if all(self.player1.search[i] != "U" for i in self.player2.indexes) or \
            all(self.player2.search[i] != "U" for i in self.player1.indexes):
             self.over = True
             self.result = 1 if self.player1_turn else 2
-            finalize_log(self.log, winner=self.result)
+            if self.log is not None:
+                finalize_log(self.move_log(), winner=self.result)
+            return result
+        if not hit:
+            self.player1_turn = not self.player1_turn
+            if self.human1 != self.human2:
+                self.computer_turn = not self.computer_turn
+        return result
+
+    def _make_move_bitboard(self, index):
+        player = self.player1 if self.player1_turn else self.player2
+        opponent = self.player2 if self.player1_turn else self.player1
+        bit = 1 << index
+        # Tekrar eden vuruşu engelle
+        if player.shot_mask & bit:
             return
+        player.shot_mask |= bit
+        hit = opponent.fleet_mask & bit
+        if hit:
+            player.hit_mask |= bit
+            result = "hit"
+            ship_mask = opponent.ship_at[index]
+            if not ship_mask & ~player.hit_mask:
+                player.sunk_mask |= ship_mask
+                result = "sunk"
+        else:
+            result = "miss"
+        self.n_shots += 1
+        if player.density is not None:
+            player.density.resolve(index)
+        if self.moves is not None:
+            self.moves[self.n_shots - 1] = \
+                index | (0 if self.player1_turn else 0x80) | RESULT_CODES[result] << 8
+        # Oyun bitti mi? Sadece atış yapan oyuncunun durumu değişebilir
+        if hit and not opponent.fleet_mask & ~player.hit_mask:
+            self.over = True
+            self.result = 1 if self.player1_turn else 2
+            if self.log is not None:
+                finalize_log(self.move_log(), winner=self.result)
+            return result
         if not hit:
             self.player1_turn = not self.player1_turn
             if self.human1 != self.human2:
                 self.computer_turn = not self.computer_turn
+        return result
+
+    def _cells(self, state):
+        if not self.bitboard:
+            return [i for i, sq in enumerate(self.current_search) if sq == state]
+        player = self.player1 if self.player1_turn else self.player2
+        if state == "U":
+            mask = ~player.shot_mask
+        else:
+            mask = player.hit_mask & ~player.sunk_mask
+        return [i for i in range(100) if mask >> i & 1]
 
     def random_ai(self):
-        unknown = [i for i, sq in enumerate(self.current_search) if sq == "U"]
+        unknown = self._cells("U")
         if unknown:
             self.make_move(random.choice(unknown))
 
     def basic_ai(self):
-        unknown = [i for i, sq in enumerate(self.current_search) if sq == "U"]
-        hits = [i for i, sq in enumerate(self.current_search) if sq == "H"]
-        near = [u for u in unknown if any(abs(u-h) in (1, 10) for h in hits)]
+        unknown = self._cells("U")
+        if self.bitboard:
+            # abs(u-h) in (1, 10) koşulunun maske karşılığı
+            player = self.player1 if self.player1_turn else self.player2
+            h = player.hit_mask & ~player.sunk_mask
+            near_mask = (h << 1 | h >> 1 | h << 10 | h >> 10) & ~player.shot_mask
+            near = [u for u in unknown if near_mask >> u & 1]
+        else:
+            hits = self._cells("H")
+            near = [u for u in unknown if any(abs(u-h) in (1, 10) for h in hits)]
         if near:
             self.make_move(random.choice(near))
             return
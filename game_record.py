@@ -0,0 +1,233 @@
+# game_record.py
+"""
+Hamle logları için sıkıştırılmış ikili oyun kaydı (.sbr).
+
+Dosya, arka arkaya eklenmiş kayıtlardan oluşur. Her kayıt:
+
+    uint32  kayıt uzunluğu (bu alan hariç)
+    başlık  HEADER: magic, sürüm, bayraklar, kazanan, gemi sayıları,
+            başlangıç/bitiş (epoch saniye), hamle sayısı
+    metin   game_id, user_id, username (uint16 uzunluk + utf-8)
+    gemiler her gemi için: uint8 boyut + 13 byte 100 bitlik hücre maskesi
+            (önce oyuncu 1, sonra oyuncu 2)
+    hamleler uint16[n_moves], 2 byte hizalı:
+            bit 0-6 hücre, bit 7 oyuncu (0 = 1. oyuncu), bit 8-9 sonuç
+
+Sürüm alanı şema değişikliklerinde artırılır; okuyucu bilmediği sürümü reddeder.
+"""
+import argparse
+import json
+import math
+import struct
+import sys
+from array import array
+from datetime import datetime
+from pathlib import Path
+
+MAGIC = b"SBGR"
+VERSION = 1
+LENGTH = struct.Struct("<I")
+HEADER = struct.Struct("<4sBBBBBddI")
+FLAG_SHIP_SIZES = 1  # kaynak logda "sunk" hamleleri ship_size taşıyordu
+STRING = struct.Struct("<H")
+MASK_BYTES = 13
+RESULTS = ("miss", "hit", "sunk")
+RESULT_CODES = {name: code for code, name in enumerate(RESULTS)}
+
+
+def _timestamp(iso):
+    return datetime.fromisoformat(iso).timestamp() if iso else math.nan
+
+
+def _iso(ts):
+    return None if math.isnan(ts) else datetime.fromtimestamp(ts).isoformat()
+
+
+def _cells_to_mask(cells):
+    mask = 0
+    for i in cells:
+        mask |= 1 << i
+    return mask.to_bytes(MASK_BYTES, "little")
+
+
+def _mask_to_cells(data):
+    mask = int.from_bytes(data, "little")
+    return [i for i in range(100) if mask >> i & 1]
+
+
+def encode(log_data):
+    """JSON log sözlüğünü tek bir ikili kayda çevirir (uzunluk öneki dahil)."""
+    moves = array("H")
+    flags = 0
+    for mv in log_data.get("moves", []):
+        cell = mv["cell"]["row"] * 10 + mv["cell"]["col"]
+        moves.append(cell | (mv["player"] - 1) << 7 | RESULT_CODES[mv["result"]] << 8)
+        if mv.get("ship_size") is not None:
+            flags |= FLAG_SHIP_SIZES
+    if moves.itemsize != 2:
+        raise RuntimeError("array('H') 2 byte değil")
+    if struct.pack("=H", 1) != struct.pack("<H", 1):
+        moves.byteswap()
+
+    ships1 = log_data.get("player1_ships", [])
+    ships2 = log_data.get("player2_ships", [])
+    body = bytearray(HEADER.pack(
+        MAGIC, VERSION, flags, log_data.get("winner") or 0, len(ships1), len(ships2),
+        _timestamp(log_data.get("start_time")), _timestamp(log_data.get("end_time")),
+        len(moves)))
+    for text in (log_data.get("game_id"), log_data.get("user_id"), log_data.get("username")):
+        raw = (text or "").encode("utf-8")
+        body += STRING.pack(len(raw)) + raw
+    for ship in ships1 + ships2:
+        body += bytes([ship["size"]]) + _cells_to_mask(ship["cells"])
+    if (LENGTH.size + len(body)) % 2:
+        body += b"\0"
+    body += moves.tobytes()
+    return LENGTH.pack(len(body)) + bytes(body)
+
+
+def _parse(buf, offset):
+    """offset'teki kaydın başlığını çözer; (başlık, hamle ofseti, sonraki kayıt ofseti)."""
+    (length,) = LENGTH.unpack_from(buf, offset)
+    start = offset + LENGTH.size
+    magic, version, flags, winner, n1, n2, t0, t1, n_moves = HEADER.unpack_from(buf, start)
+    if magic != MAGIC:
+        raise ValueError(f"{offset} ofsetinde geçersiz kayıt")
+    if version != VERSION:
+        raise ValueError(f"Desteklenmeyen kayıt sürümü: {version}")
+    pos = start + HEADER.size
+    texts = []
+    for _ in range(3):
+        (n,) = STRING.unpack_from(buf, pos)
+        texts.append(bytes(buf[pos + STRING.size:pos + STRING.size + n]).decode("utf-8"))
+        pos += STRING.size + n
+    ships = []
+    for _ in range(n1 + n2):
+        ships.append({"size": buf[pos], "cells": _mask_to_cells(buf[pos + 1:pos + 1 + MASK_BYTES])})
+        pos += 1 + MASK_BYTES
+    pos += (pos - offset) % 2
+    header = {
+        "game_id": texts[0], "user_id": texts[1], "username": texts[2],
+        "start_time": _iso(t0), "end_time": _iso(t1),
+        "winner": winner or None, "n_moves": n_moves, "flags": flags,
+        "player1_ships": ships[:n1], "player2_ships": ships[n1:],
+    }
+    return header, pos, start + length
+
+
+def to_json(buf, offset=0):
+    """Kaydı log_helper'ın JSON log biçimine geri çevirir (uyumluluk için)."""
+    header, pos, _ = _parse(buf, offset)
+    log_data = {
+        "game_id": header["game_id"], "user_id": header["user_id"],
+        "username": header["username"], "start_time": header["start_time"],
+        "player1_ships": header["player1_ships"], "player2_ships": header["player2_ships"],
+        "moves": [], "hit_count": {"1": 0, "2": 0}, "miss_count": {"1": 0, "2": 0},
+        "sunk_ships": [],
+    }
+    # Batan geminin boyutu kayıtta tutulmaz; gerekiyorsa rakip filodan geri bulunur
+    ship_sizes = {1: {}, 2: {}}
+    for player, fleet in ((1, header["player2_ships"]), (2, header["player1_ships"])):
+        for ship in fleet:
+            for i in ship["cells"]:
+                ship_sizes[player][i] = ship["size"]
+    for turn, (code,) in enumerate(struct.iter_unpack("<H", buf[pos:pos + 2 * header["n_moves"]]), 1):
+        player = (code >> 7 & 1) + 1
+        result = RESULTS[code >> 8 & 3]
+        row, col = divmod(code & 0x7F, 10)
+        move = {"turn": turn, "player": player, "cell": {"row": row, "col": col}, "result": result}
+        if result == "sunk" and header["flags"] & FLAG_SHIP_SIZES:
+            move["ship_size"] = ship_sizes[player].get(code & 0x7F)
+            log_data["sunk_ships"].append({"turn": turn, "player": player,
+                                           "ship_size": move["ship_size"]})
+        log_data["moves"].append(move)
+        counter = "miss_count" if result == "miss" else "hit_count"
+        log_data[counter][str(player)] += 1
+    log_data["end_time"] = header["end_time"]
+    log_data["winner"] = header["winner"]
+    log_data["total_turns"] = header["n_moves"]
+    return log_data
+
+
+def append_record(path, log_data):
+    with open(path, "ab") as f:
+        f.write(encode(log_data))
+
+
+def iter_records(buf):
+    """Tampondaki kayıtları (kayıt ofseti, başlık, hamle ofseti) olarak sırayla üretir."""
+    offset = 0
+    while offset + LENGTH.size <= len(buf):
+        header, pos, end = _parse(buf, offset)
+        yield offset, header, pos
+        offset = end
+
+
+def read_games(path):
+    """.sbr dosyasındaki oyunları JSON log sözlükleri olarak akıtır."""
+    data = Path(path).read_bytes()
+    for offset, _, _ in iter_records(data):
+        yield to_json(data, offset)
+
+
+def load_moves(paths):
+    """
+    .sbr dosyalarını mmap ile açar ve tüm hamleleri NumPy dizilerine çözer.
+    Hamle blokları np.frombuffer ile kopyasız okunur; bit alanları vektörel ayrılır.
+    Dönen sözlük: game, turn, player, cell, row, col, result dizileri ve game_ids listesi.
+    """
+    import mmap
+    import numpy as np
+
+    blocks, games, game_ids = [], [], []
+    for path in paths:
+        with open(path, "rb") as f:
+            if Path(path).stat().st_size == 0:
+                continue
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        for _, header, pos in iter_records(mm):
+            blocks.append(np.frombuffer(mm, "<u2", header["n_moves"], pos))
+            games.append(header["n_moves"])
+            game_ids.append(header["game_id"])
+
+    codes = np.concatenate(blocks) if blocks else np.zeros(0, "<u2")
+    counts = np.array(games, np.int64)
+    game = np.repeat(np.arange(len(counts), dtype=np.int32), counts)
+    starts = np.repeat(np.cumsum(counts) - counts, counts)
+    cell = (codes & 0x7F).astype(np.int8)
+    return {
+        "game": game,
+        "turn": (np.arange(len(codes)) - starts + 1).astype(np.int32),
+        "player": ((codes >> 7 & 1) + 1).astype(np.int8),
+        "cell": cell,
+        "row": cell // 10,
+        "col": cell % 10,
+        "result": (codes >> 8 & 3).astype(np.int8),
+        "game_ids": game_ids,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="İkili oyun kayıtları (.sbr)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    convert = sub.add_parser("convert", help="kullanıcının JSONL deposunu games.sbr'ye çevir")
+    convert.add_argument("user_dir")
+    export = sub.add_parser("export", help=".sbr dosyasını JSON dizisi olarak yaz")
+    export.add_argument("path")
+    args = parser.parse_args(argv)
+
+    if args.command == "convert":
+        from game_store import GameStore
+        out = Path(args.user_dir) / "games.sbr"
+        n = 0
+        with open(out, "wb") as f:
+            for log_data in GameStore(args.user_dir).iter_games():
+                f.write(encode(log_data))
+                n += 1
+        print(f"{n} oyun {out} dosyasına yazıldı")
+    else:
+        json.dump(list(read_games(args.path)), sys.stdout, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+# game_store.py
+"""
+Kullanıcı başına yalnızca-ekleme (append-only) JSON Lines oyun deposu.
+
+    games.jsonl          aktif segment, satır başına bir oyun logu
+    games.NNNNN.jsonl    döndürülmüş (rotate) eski segmentler
+    games.idx            game_id<TAB>segment<TAB>offset<TAB>uzunluk satırları
+
+finalize_log her oyunu O(1) ekler; okuyucular segmentleri satır satır akıtır.
+Depo ilk oyunla kurulurken önceki combined_logs.json / game_*.json oyunları
+içine aktarılır, böylece depo kullanıcının tüm geçmişini tutar.
+"""
+import argparse
+import json
+import os
+from pathlib import Path
+
+ACTIVE = "games.jsonl"
+INDEX = "games.idx"
+
+
+class GameStore:
+    def __init__(self, user_dir, max_bytes=64 * 1024 * 1024):
+        self.dir = Path(user_dir)
+        self.max_bytes = max_bytes
+        self._index = None
+
+    @property
+    def active_path(self):
+        return self.dir / ACTIVE
+
+    @property
+    def index_path(self):
+        return self.dir / INDEX
+
+    def exists(self):
+        return self.index_path.exists()
+
+    def segments(self):
+        """Eski segmentler sırayla, en sonda aktif segment."""
+        rotated = sorted(p.name for p in self.dir.glob("games.*.jsonl"))
+        if self.active_path.exists():
+            rotated.append(ACTIVE)
+        return rotated
+
+    def append(self, log_data):
+        self.append_many([log_data])
+
+    def append_many(self, logs, fsync=False):
+        """Birden çok oyunu tek açılışta ekler; fsync=True ise diske kadar zorlar."""
+        self.dir.mkdir(parents=True, exist_ok=True)
+        if not self.exists():
+            # Depo ilk kez kuruluyor: önceki biçimlerdeki oyunlar kaybolmasın diye önce onları aktar
+            batch = {log_data["game_id"] for log_data in logs}
+            logs = [g for g in legacy_games(self.dir) if g.get("game_id") not in batch] + list(logs)
+        entries = []
+        f = open(self.active_path, "ab")
+        try:
+            for log_data in logs:
+                line = (json.dumps(log_data, ensure_ascii=False) + "\n").encode("utf-8")
+                if self.max_bytes and f.tell() and f.tell() + len(line) > self.max_bytes:
+                    f.close()
+                    self._append_index(entries, fsync)
+                    entries = []
+                    self.rotate()
+                    f = open(self.active_path, "ab")
+                entries.append((log_data["game_id"], ACTIVE, f.tell(), len(line)))
+                f.write(line)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        finally:
+            f.close()
+        self._append_index(entries, fsync)
+
+    def _append_index(self, entries, fsync=False):
+        if not entries:
+            return
+        with open(self.index_path, "a", encoding="utf-8") as f:
+            for entry in entries:
+                f.write("\t".join(map(str, entry)) + "\n")
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        if self._index is not None:
+            for entry in entries:
+                self._index[entry[0]] = entry[1:]
+
+    def rotate(self):
+        """Aktif segmenti numaralı bir segmente taşır ve indeksi günceller."""
+        if not self.active_path.exists():
+            return
+        n = len(list(self.dir.glob("games.*.jsonl"))) + 1
+        name = f"games.{n:05d}.jsonl"
+        os.replace(self.active_path, self.dir / name)
+        entries = [(gid, name if seg == ACTIVE else seg, off, length)
+                   for gid, seg, off, length in self.entries()]
+        self._write_index(entries)
+
+    def entries(self):
+        """İndeks kayıtlarını eklenme sırasıyla üretir: (game_id, segment, offset, uzunluk)."""
+        if not self.index_path.exists():
+            return
+        with open(self.index_path, encoding="utf-8") as f:
+            for line in f:
+                parts = line.rstrip("\n").split("\t")
+                if len(parts) == 4:
+                    yield parts[0], parts[1], int(parts[2]), int(parts[3])
+
+    def index(self):
+        if self._index is None:
+            self._index = {gid: (seg, off, length) for gid, seg, off, length in self.entries()}
+        return self._index
+
+    def get(self, game_id):
+        entry = self.index().get(game_id)
+        if entry is None:
+            return None
+        return self.read(*entry)
+
+    def read(self, segment, offset, length):
+        with open(self.dir / segment, "rb") as f:
+            f.seek(offset)
+            return json.loads(f.read(length))
+
+    def iter_games(self):
+        """Tüm oyunları segment sırasıyla, belleğe toplamadan akıtır."""
+        for segment in self.segments():
+            with open(self.dir / segment, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        try:
+                            yield json.loads(line)
+                        except ValueError:
+                            continue  # yarım yazılmış son satır
+
+    def compact(self):
+        """
+        Tüm segmentleri tek bir aktif segmentte birleştirir. Her fiziksel kayıt
+        (segment, offset) bir kez taşınır; game_id'si çakışan eski oyunlar da korunur.
+        İndekse hiç girmemiş (yazımı yarım kalmış) satırlar atılır.
+        """
+        tmp = self.dir / (ACTIVE + ".tmp")
+        entries = []
+        seen = set()
+        files = {}
+        try:
+            with open(tmp, "wb") as out:
+                for gid, segment, offset, length in self.entries():
+                    if (segment, offset) in seen:
+                        continue
+                    seen.add((segment, offset))
+                    if segment not in files:
+                        files[segment] = open(self.dir / segment, "rb")
+                    f = files[segment]
+                    f.seek(offset)
+                    line = f.read(length)
+                    entries.append((gid, ACTIVE, out.tell(), len(line)))
+                    out.write(line)
+        finally:
+            for f in files.values():
+                f.close()
+        old = [self.dir / s for s in self.segments() if s != ACTIVE]
+        os.replace(tmp, self.active_path)
+        for path in old:
+            path.unlink()
+        self._write_index(entries)
+
+    def import_combined(self, combined_file):
+        """Eski combined_logs.json dizisini depoya aktarır."""
+        with open(combined_file, encoding="utf-8") as f:
+            logs = json.load(f)
+        known = set(self.index())
+        for log_data in logs:
+            if log_data.get("game_id") not in known:
+                self.append(log_data)
+        return len(logs)
+
+    def _write_index(self, entries):
+        tmp = self.dir / (INDEX + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            for entry in entries:
+                f.write("\t".join(map(str, entry)) + "\n")
+        os.replace(tmp, self.index_path)
+        self._index = None
+
+
+def legacy_games(user_dir):
+    """Depo öncesi oyunları akıtır: combined_logs.json, yoksa tek tek game_*.json dosyaları."""
+    user_dir = Path(user_dir)
+    combined_file = user_dir / "combined_logs.json"
+    if combined_file.exists():
+        json_paths = [combined_file]
+    else:
+        json_paths = sorted(user_dir.glob("game_*.json"))
+
+    for path in json_paths:
+        try:
+            with open(path, encoding='utf-8') as f:
+                data_list = json.load(f)
+        except Exception:
+            continue
+        for data in data_list if isinstance(data_list, list) else [data_list]:
+            if isinstance(data, dict) and "moves" in data:
+                yield data
+
+
+def iter_user_games(user_dir):
+    """
+    Bir kullanıcının oyunlarını akıtır. Depo ilk oyunda eski dosyaları içine
+    aktardığından depo varsa tek kaynak odur; yoksa eski dosyalar okunur.
+    """
+    store = GameStore(user_dir)
+    if store.exists():
+        yield from store.iter_games()
+    else:
+        yield from legacy_games(user_dir)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="JSONL oyun deposu bakımı")
+    parser.add_argument("user_dir")
+    parser.add_argument("command", choices=("compact", "rotate", "import"))
+    args = parser.parse_args(argv)
+    store = GameStore(args.user_dir)
+    if args.command == "compact":
+        store.compact()
+    elif args.command == "rotate":
+        store.rotate()
+    else:
+        n = store.import_combined(Path(args.user_dir) / "combined_logs.json")
+        print(f"{n} oyun aktarıldı")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,11 +3,20 @@ import json
 import uuid
 from datetime import datetime
 from pathlib import Path
+import analytics_store
+from game_record import RESULTS as MOVE_RESULTS
+from game_store import GameStore
+from log_writer import LogWriter, write_game_file
 
 BASE_DIR = Path(__file__).parent
 LOGS_DIR = BASE_DIR / "logs"
 USER_INFO_FILE = BASE_DIR / "user_info.json"
 
+# finalize_log logları arka plan yazıcısına mı versin; "game" | "batch" | "exit"
+ASYNC_WRITES = True
+LOG_DURABILITY = "batch"
+_log_writer = None
+
 
 def load_user_info():
     if USER_INFO_FILE.exists():
@@ -47,11 +56,13 @@ def get_username():
 def create_log_data(player1_ships, player2_ships):
     if user_id is None:
         raise ValueError("User ID not set. Call set_username() before logging.")
+    now = datetime.now()
     return {
-        "game_id": datetime.now().strftime("%Y%m%d_%H%M%S") + f"_{user_id}",
+        # Zaman damgası tek başına benzersiz değil (hızlı seriler aynı saniyede/µs'de biter)
+        "game_id": now.strftime("%Y%m%d_%H%M%S_%f") + f"_{uuid.uuid4().hex[:8]}_{user_id}",
         "user_id": user_id,
         "username": username,
-        "start_time": datetime.now().isoformat(),
+        "start_time": now.isoformat(),
         "player1_ships": [{"size": ship.size, "cells": ship.indexes} for ship in player1_ships],
         "player2_ships": [{"size": ship.size, "cells": ship.indexes} for ship in player2_ships],
         "moves": [],
@@ -74,6 +85,13 @@ def add_move(log_data, turn, player, index, result, ship_size=None):
         log_data["miss_count"][str(player)] += 1
 
 
+def add_packed_moves(log_data, codes, first_turn=1):
+    """game_record biçimindeki paketlenmiş hamle kodlarını log_data'ya ekler."""
+    for turn, code in enumerate(codes, start=first_turn):
+        add_move(log_data, turn=turn, player=(code >> 7 & 1) + 1, index=code & 0x7F,
+                 result=MOVE_RESULTS[code >> 8 & 3])
+
+
 def finalize_log(log_data, winner):
     if user_id is None:
         raise ValueError("User ID not set. Call set_username() before finalizing log.")
@@ -82,22 +100,26 @@ def finalize_log(log_data, winner):
     log_data["winner"] = winner
     log_data["total_turns"] = len(log_data["moves"])
 
-    # Her oyun için ayrı dosya
-    game_file = LOGS_DIR / username / f"game_{log_data['game_id']}.json"
-
-    # Dosyayı kaydet
-    with open(game_file, "w", encoding="utf-8") as f:
-        json.dump(log_data, f, indent=2)
-
-    # Oyunu combined_logs.json'a da ekleyelim (opsiyonel)
-    combined_file = LOGS_DIR / username / "combined_logs.json"
-    logs = []
-    if combined_file.exists():
-        try:
-            with open(combined_file, "r", encoding="utf-8") as f:
-                logs = json.load(f)
-        except Exception:
-            logs = []
-    logs.append(log_data)
-    with open(combined_file, "w", encoding="utf-8") as f:
-        json.dump(logs, f, indent=2)
\ No newline at end of file
+    user_dir = LOGS_DIR / username
+    if not ASYNC_WRITES:
+        # Her oyun için ayrı dosya + kullanıcının JSONL deposu (O(1) ekleme)
+        user_dir.mkdir(parents=True, exist_ok=True)
+        write_game_file(user_dir / f"game_{log_data['game_id']}.json", log_data)
+        GameStore(user_dir).append(log_data)
+        analytics_store.update(user_dir, [log_data])
+        return
+    # Diske yazma arka plan yazıcısında; oyun döngüsü beklemez
+    get_log_writer().submit(user_dir, log_data)
+
+
+def get_log_writer():
+    global _log_writer
+    if _log_writer is None:
+        _log_writer = LogWriter(durability=LOG_DURABILITY)
+    return _log_writer
+
+
+def flush_logs():
+    """Arka planda bekleyen logların yazılmasını bekler."""
+    if _log_writer is not None:
+        _log_writer.flush()
@@ -0,0 +1,144 @@
+# log_writer.py
+"""
+Biten oyun loglarını oyun/eğitim döngüsünü bekletmeden diske yazan arka plan yazıcısı.
+
+finalize_log logu sınırlı bir kuyruğa bırakır; yazıcı iş parçacığı kuyruktan
+toplu (batch) alır, her oyunun JSON dosyasını yazar, oyunları kullanıcının
+GameStore deposuna tek açılışta ekler ve analiz özetlerini günceller.
+Kuyruk doluysa submit bekler (geri basınç).
+
+Dayanıklılık politikası (durability):
+    "game"   her oyundan sonra fsync
+    "batch"  her flush_every oyunda bir fsync
+    "exit"   fsync sadece kapanışta (close/atexit)
+"""
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+
+import analytics_store
+from game_store import GameStore
+
+POLICIES = ("game", "batch", "exit")
+_STOP = object()
+
+
+def write_game_file(path, log_data, fsync=False):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(log_data, f, indent=2)
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+
+
+class LogWriter:
+    def __init__(self, durability="batch", flush_every=16, max_queue=256, batch_size=32):
+        if durability not in POLICIES:
+            raise ValueError(f"Bilinmeyen dayanıklılık politikası: {durability}")
+        self.durability = durability
+        self.flush_every = flush_every
+        self.batch_size = batch_size
+        self.queue = queue.Queue(max_queue)
+        self.written = 0
+        self.batches = 0
+        self.errors = 0
+        self.max_depth = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self._unsynced = 0
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, user_dir, log_data):
+        """Logu yazılmak üzere kuyruğa ekler; kuyruk doluysa yer açılana kadar bekler."""
+        if self._thread is None:
+            raise RuntimeError("LogWriter kapatıldı")
+        self.queue.put((Path(user_dir), log_data, time.perf_counter()))
+        depth = self.queue.qsize()
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+    def flush(self):
+        """Kuyruktaki tüm loglar yazılana kadar bekler."""
+        self.queue.join()
+
+    def close(self):
+        """Kuyruğu boşaltır, son fsync'i yapar ve iş parçacığını durdurur."""
+        if self._thread is None:
+            return
+        self.queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+        atexit.unregister(self.close)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "queue_depth": self.queue.qsize(),
+                "max_queue_depth": self.max_depth,
+                "written": self.written,
+                "batches": self.batches,
+                "errors": self.errors,
+                "mean_latency": self.total_latency / self.written if self.written else 0.0,
+                "max_latency": self.max_latency,
+            }
+
+    def _run(self):
+        stop = False
+        while not stop:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            if batch[-1] is _STOP:
+                batch.pop()
+                stop = True
+            try:
+                self._write(batch, final=stop)
+            except Exception as e:
+                with self._lock:
+                    self.errors += len(batch)
+                print(f"Log yazılamadı: {e}")
+            finally:
+                for _ in range(len(batch) + stop):
+                    self.queue.task_done()
+
+    def _write(self, batch, final=False):
+        self._unsynced += len(batch)
+        if self.durability == "game":
+            fsync = True
+        elif self.durability == "batch":
+            fsync = self._unsynced >= self.flush_every
+        else:
+            fsync = False
+        fsync = fsync or (final and self._unsynced > 0)
+
+        by_user = {}
+        for user_dir, log_data, _ in batch:
+            user_dir.mkdir(parents=True, exist_ok=True)
+            write_game_file(user_dir / f"game_{log_data['game_id']}.json", log_data,
+                            fsync=self.durability == "game")
+            by_user.setdefault(user_dir, []).append(log_data)
+        for user_dir, logs in by_user.items():
+            GameStore(user_dir).append_many(logs, fsync=fsync)
+            analytics_store.update(user_dir, logs)
+        if fsync:
+            self._unsynced = 0
+
+        now = time.perf_counter()
+        with self._lock:
+            self.batches += bool(batch)
+            for _, _, submitted in batch:
+                latency = now - submitted
+                self.written += 1
+                self.total_latency += latency
+                if latency > self.max_latency:
+                    self.max_latency = latency
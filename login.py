@@ -3,16 +3,26 @@ import pygame
 import sys
 from log_helper import set_username, load_user_info
 
-pygame.init()
-pygame.font.init()
+# Pencere ve fontlar import sırasında değil, giriş ekranı gerçekten gerektiğinde açılır
+SCREEN = None
+SCREEN_WIDTH = SCREEN_HEIGHT = 0
+FONT = INPUT_FONT = None
 
-Display_resolution = pygame.display.Info()
-SCREEN_WIDTH, SCREEN_HEIGHT = Display_resolution.current_w, Display_resolution.current_h
-SCREEN = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.RESIZABLE)
-pygame.display.set_caption("Battleship - Giriş")
 
-FONT = pygame.font.SysFont("arial", 36)
-INPUT_FONT = pygame.font.SysFont("arial", 28)
+def init_display():
+    global SCREEN, SCREEN_WIDTH, SCREEN_HEIGHT, FONT, INPUT_FONT
+    if SCREEN is not None:
+        return
+    pygame.init()
+    pygame.font.init()
+
+    Display_resolution = pygame.display.Info()
+    SCREEN_WIDTH, SCREEN_HEIGHT = Display_resolution.current_w, Display_resolution.current_h
+    SCREEN = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.RESIZABLE)
+    pygame.display.set_caption("Battleship - Giriş")
+
+    FONT = pygame.font.SysFont("arial", 36)
+    INPUT_FONT = pygame.font.SysFont("arial", 28)
 
 WHITE = (255, 255, 255)
 GRAY = (50, 50, 50)
@@ -32,6 +42,7 @@ def login_screen():
         return last_username
 
     # Giriş ekranı
+    init_display()
     input_width, input_height = 400, 50
     button_width, button_height = 200, 50
 
@@ -1,24 +1,37 @@
 import json
 from pathlib import Path
+from game_store import GameStore
 
-def merge_logs(user_id, output_file="merged_logs.json"):
-    log_dir = Path("logs") / user_id
-    merged = []
-
+def iter_logs(log_dir, output_file):
+    store = GameStore(log_dir)
+    if store.exists():
+        # JSONL deposundan akıtarak oku
+        yield from store.iter_games()
+        return
     for log_file in log_dir.glob("*.json"):
         if log_file.name == output_file:
             continue  # avoid including the output file if it already exists
         try:
             with open(log_file, encoding='utf-8') as f:
                 data = json.load(f)
-            merged.append(data)
+            yield data
         except Exception as e:
             print(f"Error reading {log_file.name}: {e}")
 
+def merge_logs(user_id, output_file="merged_logs.json"):
+    log_dir = Path("logs") / user_id
     output_path = log_dir / output_file
+    count = 0
+
+    # Tüm logları belleğe toplamadan diziyi parça parça yaz
     with open(output_path, "w", encoding='utf-8') as f:
-        json.dump(merged, f, indent=2, ensure_ascii=False)
-    print(f"Merged {len(merged)} logs into {output_path}")
+        f.write("[")
+        for data in iter_logs(log_dir, output_file):
+            f.write(",\n" if count else "\n")
+            f.write(json.dumps(data, indent=2, ensure_ascii=False))
+            count += 1
+        f.write("\n]" if count else "]")
+    print(f"Merged {count} logs into {output_path}")
 
 # Örnek kullanım:
 if __name__ == "__main__":
@@ -0,0 +1,139 @@
+# placements.py
+from collections import Counter
+from functools import lru_cache
+
+SHIP_SIZES = (5, 4, 3, 3, 2)
+
+
+def _build_placements(size):
+    """Önce yatay, sonra dikey olmak üzere tüm geçerli gemi yerleşimleri."""
+    cells = []
+    for r in range(10):
+        for c in range(10 - size + 1):
+            cells.append(tuple(r * 10 + c + i for i in range(size)))
+    for c in range(10):
+        for r in range(10 - size + 1):
+            cells.append(tuple((r + i) * 10 + c for i in range(size)))
+    return cells
+
+
+# Boyut başına yerleşimlerin hücre listeleri ve 100 bitlik maskeleri
+PLACEMENTS = {size: _build_placements(size) for size in range(1, 11)}
+PLACEMENT_MASKS = {
+    size: [sum(1 << i for i in cells) for cells in placements]
+    for size, placements in PLACEMENTS.items()
+}
+
+
+@lru_cache(maxsize=None)
+def incidence_matrix(size):
+    """(yerleşim sayısı, 100) boyutlu 0/1 matrisi; her boyut için bir kez kurulur."""
+    import numpy as np
+    placements = PLACEMENTS[size]
+    matrix = np.zeros((len(placements), 100), np.float32)
+    for p, cells in enumerate(placements):
+        matrix[p, list(cells)] = 1.0
+    matrix.setflags(write=False)
+    return matrix
+
+
+def placement_density(unknown, ship_sizes=SHIP_SIZES):
+    """
+    unknown: (B, 100) ya da (100,) 0/1 dizisi ('U' hücreleri 1).
+    Her hücreyi kaplayan, tamamen bilinmeyen hücrelerden oluşan yerleşim
+    sayısını döndürür (aynı boyuttaki her gemi ayrı sayılır).
+    """
+    import numpy as np
+    unknown = np.asarray(unknown, np.float32)
+    density = np.zeros(unknown.shape, np.float32)
+    for size, count in Counter(ship_sizes).items():
+        matrix = incidence_matrix(size)
+        valid = (unknown @ matrix.T) == size
+        density += count * (valid.astype(np.float32) @ matrix)
+    return density
+
+
+def sample_fleets(n, ship_sizes=SHIP_SIZES, rng=None):
+    """
+    n filoyu toplu örnekler. (n, 100) int8 dizi döndürür: her hücrede gemi
+    numarası (1'den başlar, ship_sizes sırasıyla), 0 = boş.
+    """
+    import numpy as np
+    rng = np.random.default_rng(rng)
+    fleets = np.zeros((n, 100), np.int8)
+    occupied = np.zeros((n, 100), np.float32)
+    for k, size in enumerate(ship_sizes, start=1):
+        matrix = incidence_matrix(size)
+        # Dolu hücrelerle kesişmeyen yerleşimler arasından eşit olasılıkla seç
+        valid = (occupied @ matrix.T) == 0
+        keys = rng.random(valid.shape)
+        keys[~valid] = -1.0
+        chosen = matrix[keys.argmax(axis=1)] > 0
+        fleets[chosen] = k
+        occupied[chosen] = 1.0
+    return fleets
+
+
+@lru_cache(maxsize=None)
+def _tracker_tables(ship_sizes):
+    cells, weights = [], []
+    for size, count in sorted(Counter(ship_sizes).items()):
+        cells.extend(PLACEMENTS[size])
+        weights.extend([count] * len(PLACEMENTS[size]))
+    by_cell = [[] for _ in range(100)]
+    for p, placement in enumerate(cells):
+        for i in placement:
+            by_cell[i].append(p)
+    counts = [0] * 100
+    for placement, w in zip(cells, weights):
+        for i in placement:
+            counts[i] += w
+    return tuple(cells), tuple(weights), tuple(tuple(ps) for ps in by_cell), tuple(counts)
+
+
+class DensityTracker:
+    """
+    Yerleşim yoğunluğunu atış başına artımlı günceller. Bir hücre çözüldüğünde
+    (H/M/S) sadece o hücreyi kaplayan yerleşimler geçersiz sayılır ve
+    kapladıkları hücrelerin sayaçlarından düşülür.
+    """
+
+    def __init__(self, ship_sizes=SHIP_SIZES, search=None):
+        self.ship_sizes = tuple(ship_sizes)
+        self._cells, self._weights, self._by_cell, counts = _tracker_tables(self.ship_sizes)
+        self.valid = bytearray(b"\x01" * len(self._cells))
+        self.counts = list(counts)
+        self.resolved = bytearray(100)
+        if search is not None:
+            self.sync(search)
+
+    def resolve(self, cell):
+        if self.resolved[cell]:
+            return
+        self.resolved[cell] = 1
+        valid, counts = self.valid, self.counts
+        for p in self._by_cell[cell]:
+            if valid[p]:
+                valid[p] = 0
+                w = self._weights[p]
+                for i in self._cells[p]:
+                    counts[i] -= w
+
+    def sync(self, search):
+        """search grid'de çözülmüş ama henüz işlenmemiş hücreleri uygular."""
+        for i, v in enumerate(search):
+            if v != "U" and not self.resolved[i]:
+                self.resolve(i)
+
+    def probabilities(self):
+        total = sum(self.counts)
+        return [c / total for c in self.counts] if total > 0 else [0.0] * 100
+
+    def snapshot(self):
+        return bytes(self.valid), list(self.counts), bytes(self.resolved)
+
+    def restore(self, snapshot):
+        valid, counts, resolved = snapshot
+        self.valid = bytearray(valid)
+        self.counts = list(counts)
+        self.resolved = bytearray(resolved)
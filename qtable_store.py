@@ -0,0 +1,245 @@
+# qtable_store.py
+"""
+Bellek eşlemeli (mmap) ikili Q-table dosyası.
+
+Dosya düzeni:
+    başlık (64 byte) | yuva dizisi uint32[capacity] | anahtarlar uint8[count, 25]
+    | değerler dtype[count, 100]
+
+Yuvalar açık adreslemeli (doğrusal yoklama) bir hash indeksidir; her yuva
+satır numarası + 1 tutar (0 = boş). Dosya açılırken sadece başlık okunur,
+geri kalanı erişildikçe sayfalanır. Var olan state'lerin değerleri yerinde
+güncellenir; yeni state'ler "<dosya>.append" ek bölgesine (anahtar + değerler
+kayıtları) sadece sona eklenir ve compact() ile ana dosyaya birleştirilir.
+Ek bölge de mmap ile açılır; oradaki satırlar da yerinde güncellenir.
+"""
+import os
+import struct
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+MAGIC = b"SBQT"
+VERSION = 1
+HEADER = struct.Struct("<4sHHHBBII")
+HEADER_SIZE = 64
+KEY_SIZE = 25
+N_ACTIONS = 100
+DTYPES = {0: np.float32, 1: np.float16}
+DTYPE_CODES = {np.dtype(v): k for k, v in DTYPES.items()}
+
+
+def _slot(key, capacity):
+    return zlib.crc32(key) & (capacity - 1)
+
+
+def _align(offset, n=8):
+    return (offset + n - 1) // n * n
+
+
+def _layout(capacity, count, dtype):
+    slots = HEADER_SIZE
+    keys = _align(slots + 4 * capacity)
+    values = _align(keys + KEY_SIZE * count)
+    end = values + np.dtype(dtype).itemsize * N_ACTIONS * count
+    return slots, keys, values, end
+
+
+def write_table(path, table, value_dtype=np.float32, symmetric=False):
+    """dict benzeri {anahtar: satır} tablosundan yeni bir ana dosya yazar (atomik)."""
+    path = Path(path)
+    keys = list(table)
+    count = len(keys)
+    capacity = 16
+    while capacity < 2 * count:
+        capacity *= 2
+    dtype = np.dtype(value_dtype)
+    slots_off, keys_off, values_off, end = _layout(capacity, count, dtype)
+
+    slots = np.zeros(capacity, np.uint32)
+    for row, key in enumerate(keys):
+        i = _slot(key, capacity)
+        while slots[i]:
+            i = (i + 1) & (capacity - 1)
+        slots[i] = row + 1
+    values = np.zeros((count, N_ACTIONS), dtype)
+    for row, key in enumerate(keys):
+        values[row] = table[key]
+
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, KEY_SIZE, N_ACTIONS, DTYPE_CODES[dtype],
+                            int(symmetric), capacity, count).ljust(HEADER_SIZE, b"\0"))
+        f.write(slots.tobytes())
+        f.write(b"\0" * (keys_off - f.tell()))
+        f.write(b"".join(keys))
+        f.write(b"\0" * (values_off - f.tell()))
+        f.write(values.tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class MappedQTable:
+    """
+    QLearningAgent.q_table yerine kullanılabilen, defaultdict gibi davranan
+    mmap tabanlı tablo: eksik anahtar sıfır satırla ek bölgeye eklenir.
+    """
+
+    def __init__(self, path, value_dtype=np.float32, symmetric=False, compact_every=4096):
+        self.path = Path(path)
+        self.append_path = self.path.with_name(self.path.name + ".append")
+        self.value_dtype = np.dtype(value_dtype)
+        self.symmetric = symmetric
+        self.compact_every = compact_every
+        if not self.path.exists():
+            write_table(self.path, {}, self.value_dtype, symmetric)
+        self._open()
+
+    def _open(self):
+        with open(self.path, "rb") as f:
+            magic, version, key_size, n_actions, dtype_code, symmetric, capacity, count = \
+                HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION or key_size != KEY_SIZE or n_actions != N_ACTIONS:
+            raise ValueError(f"{self.path} geçerli bir Q-table dosyası değil")
+        self.value_dtype = np.dtype(DTYPES[dtype_code])
+        self.symmetric = bool(symmetric)
+        self.capacity, self.count = capacity, count
+        slots_off, keys_off, values_off, _ = _layout(capacity, count, self.value_dtype)
+        self._slots = np.memmap(self.path, np.uint32, "r", slots_off, (capacity,))
+        if count:
+            self._keys = np.memmap(self.path, np.uint8, "r", keys_off, (count, KEY_SIZE))
+            self._values = np.memmap(self.path, self.value_dtype, "r+", values_off,
+                                     (count, N_ACTIONS))
+        else:
+            self._keys = np.zeros((0, KEY_SIZE), np.uint8)
+            self._values = np.zeros((0, N_ACTIONS), self.value_dtype)
+        self._record = np.dtype([("key", np.uint8, KEY_SIZE),
+                                 ("values", self.value_dtype, N_ACTIONS)])
+        self._pending = {}  # son flush'tan beri eklenen, henüz diske yazılmamış satırlar
+        self._map_append()
+
+    def _map_append(self):
+        """Ek bölgeyi eşler ve sadece anahtarlarından satır indeksini kurar."""
+        self._appended = {}
+        self._append_values = None
+        if not self.append_path.exists():
+            return
+        size = self.append_path.stat().st_size
+        n = size // self._record.itemsize
+        if size != n * self._record.itemsize:
+            # Yarım yazılmış son kayıt: sonraki eklemeler hizalı kalsın diye kes
+            os.truncate(self.append_path, n * self._record.itemsize)
+        if not n:
+            return
+        records = np.memmap(self.append_path, self._record, "r+", 0, (n,))
+        self._append_values = records["values"]
+        keys = records["key"]
+        for row in range(n):
+            self._appended[keys[row].tobytes()] = row
+
+    def _find(self, key):
+        capacity = self.capacity
+        i = _slot(key, capacity)
+        slots, keys = self._slots, self._keys
+        while True:
+            row = int(slots[i])
+            if not row:
+                return -1
+            if keys[row - 1].tobytes() == key:
+                return row - 1
+            i = (i + 1) & (capacity - 1)
+
+    def get(self, key, default=None):
+        row = self._find(key) if self.count else -1
+        if row >= 0:
+            return self._values[row]
+        row = self._appended.get(key)
+        if row is not None:
+            return self._append_values[row]
+        return self._pending.get(key, default)
+
+    def __getitem__(self, key):
+        values = self.get(key)
+        if values is None:
+            values = self._pending[key] = np.zeros(N_ACTIONS, self.value_dtype)
+        return values
+
+    def __setitem__(self, key, values):
+        self[key][:] = values
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __len__(self):
+        return self.count + len(self._appended) + len(self._pending)
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def keys(self):
+        for row in range(self.count):
+            yield self._keys[row].tobytes()
+        yield from self._appended
+        yield from self._pending
+
+    def values(self):
+        for row in range(self.count):
+            yield self._values[row]
+        for row in self._appended.values():
+            yield self._append_values[row]
+        yield from self._pending.values()
+
+    def items(self):
+        return zip(self.keys(), self.values())
+
+    def flush(self):
+        """
+        Yerinde güncellemeleri diske iter ve sadece son flush'tan beri eklenen
+        satırları ek bölgenin sonuna yazar; ek bölge büyüdüyse birleştirir.
+        """
+        self._flush_maps()
+        if len(self._appended) + len(self._pending) >= self.compact_every:
+            self.compact()
+            return
+        if not self._pending:
+            return
+        records = np.zeros(len(self._pending), self._record)
+        for i, (key, values) in enumerate(self._pending.items()):
+            records[i]["key"] = np.frombuffer(key, np.uint8)
+            records[i]["values"] = values
+        with open(self.append_path, "ab") as f:
+            f.write(records.tobytes())
+        self._append_values = None
+        self._pending = {}
+        self._map_append()
+
+    def _flush_maps(self):
+        if self.count:
+            self._values.flush()
+        if self._append_values is not None:
+            self._append_values.flush()
+
+    def compact(self):
+        """Ek bölgeyi ana dosyaya birleştirip indeksi yeniden kurar."""
+        table = {key: np.array(values) for key, values in self.items()}
+        self.close()
+        write_table(self.path, table, self.value_dtype, self.symmetric)
+        if self.append_path.exists():
+            self.append_path.unlink()
+        self._open()
+
+    def clear(self):
+        self.close()
+        write_table(self.path, {}, self.value_dtype, self.symmetric)
+        if self.append_path.exists():
+            self.append_path.unlink()
+        self._open()
+
+    def close(self):
+        self._flush_maps()
+        self._slots = self._keys = self._values = self._append_values = None
@@ -0,0 +1,91 @@
+# startup_timing.py
+"""
+GUI açılış süresini ölçmek için basit zamanlayıcılar ve import süresi raporu.
+
+GUI bu modülü ilk iş olarak import eder ve her açılış adımının sonunda
+mark("adım") çağırır; süreler bir önceki işaretten itibaren ölçülür. Menü
+ekrana geldiğinde report() tek satırlık özet basar.
+
+Komut satırından:
+    python startup_timing.py [modül ...]
+modülleri `python -X importtime` ile ayrı bir süreçte import eder ve en pahalı
+importları listeler; pandas/matplotlib açılışta yükleniyorsa uyarır.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+START = time.perf_counter()
+PHASES = []
+_last = START
+
+# Açılışta yüklenmemesi gereken ağır analiz kütüphaneleri
+HEAVY_MODULES = ("pandas", "matplotlib", "matplotlib.pyplot")
+GUI_MODULES = ("engine", "log_helper", "login", "ai_agent", "ai_worker", "Log_Analiz")
+
+
+def mark(name):
+    """Bir önceki işaretten bu yana geçen süreyi name adıyla kaydeder."""
+    global _last
+    now = time.perf_counter()
+    PHASES.append((name, now - _last))
+    _last = now
+
+
+def record(name, seconds):
+    """Ana akış dışında (ör. arka plan iş parçacığında) ölçülen süreyi ekler."""
+    PHASES.append((name, seconds))
+
+
+def report():
+    parts = [f"{name} {seconds * 1000:.0f} ms" for name, seconds in PHASES]
+    total = (time.perf_counter() - START) * 1000
+    return f"Açılış süreleri: {', '.join(parts)} (toplam {total:.0f} ms)"
+
+
+def import_times(modules=GUI_MODULES):
+    """
+    Modülleri -X importtime ile ayrı bir süreçte import eder.
+    [(kümülatif µs, kendi µs, modül adı)] listesini döndürür.
+    """
+    env = dict(os.environ, PYGAME_HIDE_SUPPORT_PROMPT="1")
+    code = "import " + ", ".join(modules)
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          capture_output=True, text=True, env=env,
+                          cwd=os.path.dirname(os.path.abspath(__file__)))
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        if not own.strip().isdigit():
+            continue  # başlık satırı
+        rows.append((int(cumulative), int(own), name.strip()))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="GUI açılışındaki import sürelerini raporlar")
+    parser.add_argument("modules", nargs="*", default=list(GUI_MODULES))
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args(argv)
+
+    rows = import_times(args.modules)
+    print(f"{'kümülatif ms':>13} {'kendi ms':>9}  modül")
+    for cumulative, own, name in sorted(rows, reverse=True)[:args.top]:
+        print(f"{cumulative / 1000:13.1f} {own / 1000:9.1f}  {name}")
+    for cumulative, _, name in rows:
+        if name in args.modules:
+            print(f"{name}: {cumulative / 1000:.1f} ms")
+    loaded = {name for _, _, name in rows}
+    heavy = [m for m in HEAVY_MODULES if m in loaded]
+    if heavy:
+        print("Uyarı: açılışta ağır modüller import ediliyor: " + ", ".join(heavy))
+
+
+if __name__ == "__main__":
+    main()
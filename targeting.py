@@ -0,0 +1,201 @@
+# targeting.py
+import random
+import time
+from placements import PLACEMENT_MASKS, SHIP_SIZES
+
+
+def _by_cell(size):
+    cells = [[] for _ in range(100)]
+    for mask in PLACEMENT_MASKS[size]:
+        m = mask
+        while m:
+            low = m & -m
+            cells[low.bit_length() - 1].append(mask)
+            m ^= low
+    return cells
+
+
+def _grid_masks(search_grid):
+    hit = miss = sunk = 0
+    for i, v in enumerate(search_grid):
+        if v == "H":
+            hit |= 1 << i
+        elif v == "M":
+            miss |= 1 << i
+        elif v == "S":
+            sunk |= 1 << i
+    return hit, miss, sunk
+
+
+class MonteCarloTargeter:
+    """
+    Gözlenen isabet, ıska ve batık hücrelerle tutarlı tam filo yerleşimleri
+    örnekler ve en yüksek sonsal olasılıklı bilinmeyen hücreyi seçer.
+
+    Örnekleme Gibbs adımlarıyla yapılır: tutarlı bir başlangıç filosundan sonra
+    her adımda bir gemi, diğerleri sabitken geçerli tüm yerleşimleri arasından
+    eşit olasılıkla yeniden seçilir. Geminin mevcut yerleşimi her zaman geçerli
+    olduğundan hiçbir örnek reddedilmez ve çıkmaza girilmez. Her turun sonunda
+    bir gemi çifti birlikte yeniden seçilir ki zincir, isabetlerin hangi gemilerce
+    kaplandığı konusunda takılı kalmasın. Tamamen batmamış isabetlerin üzerinde
+    duran yerleşimler (o gemi batmış olurdu) dışlanır. 50 ms bütçe ile hamle
+    başına birkaç bin (ilişkili) örnek alınır.
+    """
+
+    def __init__(self, ship_sizes=SHIP_SIZES, time_budget=0.05, max_samples=5000,
+                 burn_in=4, rng=None):
+        self.ship_sizes = list(ship_sizes)
+        self.time_budget = time_budget
+        self.max_samples = max_samples
+        self.burn_in = burn_in  # sayılmadan atılan tam tur (her gemi bir kez) sayısı
+        self.rng = rng or random
+        self._masks = {size: PLACEMENT_MASKS[size] for size in set(self.ship_sizes)}
+        self._by_cell = {size: _by_cell(size) for size in set(self.ship_sizes)}
+        self.last_samples = 0
+
+    def remaining_sizes(self, sunk_mask):
+        """Batık hücreleri tam gemilere ayırıp kalan gemi boyutlarını döndürür."""
+        sizes = sorted(self.ship_sizes, reverse=True)
+
+        def split(cells, left):
+            if not cells:
+                return left
+            low = cells & -cells
+            cell = low.bit_length() - 1
+            for size in sorted(set(left), reverse=True):
+                for mask in self._by_cell[size][cell]:
+                    # Gemi bu hücreden başlamalı ve tamamen batık hücrelerde kalmalı
+                    if mask & (low - 1) or mask & ~cells:
+                        continue
+                    rest = list(left)
+                    rest.remove(size)
+                    found = split(cells & ~mask, rest)
+                    if found is not None:
+                        return found
+            return None
+
+        found = split(sunk_mask, sizes)
+        return found if found is not None else sizes
+
+    def _candidates(self, hit, blocked, sizes):
+        """Iska/batık hücreye değmeyen ve tamamen isabetlerin üzerinde durmayan yerleşimler."""
+        return {size: [m for m in self._masks[size] if not m & blocked and m & ~hit]
+                for size in set(sizes)}
+
+    def _initial(self, hit, candidates, sizes, max_nodes=20000):
+        """Rastgele sıralı geri izlemeyle tutarlı bir başlangıç filosu bulur: [(boyut, maske)]."""
+        rng = self.rng
+        nodes = [0]
+
+        def place(left, occupied, uncovered):
+            nodes[0] += 1
+            if nodes[0] > max_nodes:
+                return None
+            if not left:
+                return [] if not uncovered else None
+            if uncovered:
+                # Önce en küçük indeksli açık isabeti kaplayan bir gemi yerleştir
+                low = uncovered & -uncovered
+                options = [(k, m) for k, size in enumerate(left)
+                           for m in candidates[size] if m & low and not m & occupied]
+            else:
+                options = [(0, m) for m in candidates[left[0]] if not m & occupied]
+            rng.shuffle(options)
+            for k, mask in options:
+                rest = place(left[:k] + left[k + 1:], occupied | mask, uncovered & ~mask)
+                if rest is not None:
+                    return [(left[k], mask)] + rest
+            return None
+
+        return place(list(sizes), 0, hit)
+
+    def _options(self, size, others, need, candidates, allowed):
+        """Diğer gemilerle çakışmayan ve need'deki isabetlerin hepsini kaplayan yerleşimler."""
+        if not need:
+            return [m for m in candidates[size] if not m & others]
+        low = need & -need
+        return [m for m in self._by_cell[size][low.bit_length() - 1]
+                if m in allowed[size] and not m & others and not need & ~m]
+
+    def _pair_move(self, ships, sizes, i, j, occupied, hit, candidates, allowed):
+        """i ve j gemilerini, geri kalanlar sabitken geçerli çiftler arasından eşit olasılıkla seçer."""
+        others = occupied & ~ships[i] & ~ships[j]
+        need = hit & ~others
+        if not need:
+            return occupied  # çift serbest; tek gemi adımları yeterli
+        low = need & -need
+        # Gemiler ayrık olduğundan en küçük açık isabeti ikisinden tam biri kaplar
+        choices, total = [], 0
+        for x, y in ((i, j), (j, i)):
+            for mx in self._options(sizes[x], others, low, candidates, allowed):
+                partners = self._options(sizes[y], others | mx, need & ~mx, candidates, allowed)
+                if partners:
+                    choices.append((x, mx, y, partners))
+                    total += len(partners)
+        r = self.rng.randrange(total)
+        for x, mx, y, partners in choices:
+            if r < len(partners):
+                ships[x], ships[y] = mx, partners[r]
+                break
+            r -= len(partners)
+        return others | ships[i] | ships[j]
+
+    def posterior(self, search_grid):
+        """Bütçe dahilinde örnekler; bilinmeyen hücre başına gemi sayılarını döndürür."""
+        hit, miss, sunk = _grid_masks(search_grid)
+        remaining = self.remaining_sizes(sunk)
+        candidates = self._candidates(hit, miss | sunk, remaining)
+        allowed = {size: set(masks) for size, masks in candidates.items()}
+        counts = [0] * 100
+        self.last_samples = 0
+        fleet = self._initial(hit, candidates, remaining)
+        if not fleet:
+            return counts
+
+        rng = self.rng
+        sizes = [size for size, _ in fleet]
+        ships = [mask for _, mask in fleet]
+        occupied = 0
+        for mask in ships:
+            occupied |= mask
+        # Hücre sayıları en sonda yerleşim başına sayaçlardan çıkarılır
+        seen = {}
+        burn_in = self.burn_in * len(ships)
+        deadline = None if self.time_budget is None else time.perf_counter() + self.time_budget
+        n = step = 0
+        while n < self.max_samples:
+            k = step % len(ships)
+            step += 1
+            others = occupied & ~ships[k]
+            options = self._options(sizes[k], others, hit & ~others, candidates, allowed)
+            ships[k] = rng.choice(options)
+            occupied = others | ships[k]
+            if k == len(ships) - 1 and len(ships) > 1:
+                # Tur sonunda rastgele bir gemi çiftini birlikte yeniden seç: bir
+                # isabet grubunun tek gemiden iki gemiye geçmesi ancak böyle olur
+                i, j = rng.sample(range(len(ships)), 2)
+                occupied = self._pair_move(ships, sizes, i, j, occupied, hit, candidates, allowed)
+            if step <= burn_in:
+                continue
+            n += 1
+            for mask in ships:
+                seen[mask] = seen.get(mask, 0) + 1
+            if deadline is not None and n % 32 == 0 and time.perf_counter() > deadline:
+                break
+
+        unknown = ~(hit | miss | sunk) & ((1 << 100) - 1)
+        for mask, c in seen.items():
+            x = mask & unknown
+            while x:
+                low = x & -x
+                counts[low.bit_length() - 1] += c
+                x ^= low
+        self.last_samples = n
+        return counts
+
+    def choose(self, search_grid):
+        counts = self.posterior(search_grid)
+        best = max(counts)
+        if best == 0:
+            return None
+        return self.rng.choice([i for i, c in enumerate(counts) if c == best])
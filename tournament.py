@@ -1,44 +1,166 @@
 # tournament.py
+import argparse
+import random
+import time
+from collections import Counter
+from multiprocessing import Pool
+
+import numpy as np
+
 from engine import Game
-from ai_agent import QLearningAgent
-from matplotlib import pyplot as plt
-import pygame
 
-user_id = "ai_agent"  # AI için kullanıcı ID
-agent = QLearningAgent(user_id=user_id)
-agent.learn_from_logs()
+STRATEGIES = ("random", "basic", "agent", "montecarlo")
+
+
+class TournamentStats:
+    """Bitiş sırasından bağımsız biriken kazanma ve atış sayısı istatistikleri."""
+
+    def __init__(self):
+        self.games = 0
+        self.wins1 = 0
+        self.wins2 = 0
+        self.total_shots = 0
+        self.shots = Counter()
+
+    def update(self, result, n_shots):
+        self.games += 1
+        if result == 1:
+            self.wins1 += 1
+        elif result == 2:
+            self.wins2 += 1
+        self.total_shots += n_shots
+        self.shots[n_shots] += 1
+
+    @property
+    def avg_shots(self):
+        return self.total_shots / self.games if self.games else 0.0
+
+    def as_dict(self):
+        return {
+            "games": self.games,
+            "wins1": self.wins1,
+            "wins2": self.wins2,
+            "avg_shots": self.avg_shots,
+            "shots": dict(sorted(self.shots.items())),
+        }
 
-n_games = 100
-n_shots = []
-n_wins1 = 0
-n_wins2 = 0
 
-for i in range(n_games):
-    game = Game(human1=False, human2=False, username="ai_agent")
-    action = agent.choose_action(game.current_search)
+def make_strategy(name, user_id="ai_agent"):
+    """Strateji adından game -> tek hamle yapan bir fonksiyon üretir."""
+    if name == "random":
+        return Game.random_ai
+    if name == "basic":
+        return Game.basic_ai
+    if name in ("agent", "montecarlo"):
+        from ai_agent import QLearningAgent
+        targeter = None
+        if name == "montecarlo":
+            from targeting import MonteCarloTargeter
+            targeter = MonteCarloTargeter(time_budget=None, max_samples=1000)
+        agent = QLearningAgent(user_id=user_id, targeter=targeter, learn=False)
+        epsilon = agent.epsilon
 
+        def play(game):
+            action = agent.choose_action(game.current_search, game.current_density)
+            game.make_move(action)
+
+        def reset():
+            # Her oyun aynı ajan durumuyla başlar; sonuçlar işçi sayısından bağımsız kalır
+            agent.epsilon = epsilon
+            agent.target_queue = []
+
+        play.reset = reset
+        return play
+    raise ValueError(f"Bilinmeyen strateji: {name} (seçenekler: {', '.join(STRATEGIES)})")
+
+
+def seed_game(seed, index):
+    """Her oyuna kendi bağımsız RNG akışını verir (random ve np.random)."""
+    random.seed(f"{seed}:{index}")
+    np.random.seed(random.getrandbits(32))
+
+
+def play_game(strategy1, strategy2, seed, index):
+    seed_game(seed, index)
+    for strategy in (strategy1, strategy2):
+        if hasattr(strategy, "reset"):
+            strategy.reset()
+    game = Game(bitboard=True, track_density=True, log=False)
     while not game.over:
         if game.player1_turn:
-            grid = game.player2 # AI'nın görebildiği grid
-            action = agent.choose_action(grid)
-            game.make_move(action)
+            strategy1(game)
         else:
-            game.basic_ai()
-
-    n_shots.append(game.n_shots)
-    if game.result == 1:
-        n_wins1 += 1
-    elif game.result == 2:
-        n_wins2 += 1
-
-# Oyunlardan sonra öğrenme
-agent.learn_from_logs()
-
-# Sonuçları çiz
-print(f"AI Wins: {n_wins1}, BasicAI Wins: {n_wins2}")
-values = [n_shots.count(i) for i in range(17, 200)]
-plt.bar(range(17, 200), values)
-plt.xlabel("Total Shots")
-plt.ylabel("Number of Games")
-plt.title("Shot Count Distribution per Game")
-plt.show()
+            strategy2(game)
+    return index, game.result, game.n_shots
+
+
+_worker = {}
+
+
+def _init_worker(name1, name2, user_id, seed):
+    _worker["strategies"] = (make_strategy(name1, user_id), make_strategy(name2, user_id))
+    _worker["seed"] = seed
+
+
+def _play(index):
+    strategy1, strategy2 = _worker["strategies"]
+    return play_game(strategy1, strategy2, _worker["seed"], index)
+
+
+def iter_results(n_games, strategy1="agent", strategy2="basic", seed=0,
+                 workers=None, user_id="ai_agent", chunksize=64):
+    """Oyunları süreç havuzunda oynatır; (index, result, n_shots) bittikçe üretilir."""
+    if workers == 1:
+        _init_worker(strategy1, strategy2, user_id, seed)
+        for index in range(n_games):
+            yield _play(index)
+        return
+    with Pool(workers, initializer=_init_worker,
+              initargs=(strategy1, strategy2, user_id, seed)) as pool:
+        yield from pool.imap_unordered(_play, range(n_games), chunksize=chunksize)
+
+
+def run_tournament(n_games, strategy1="agent", strategy2="basic", seed=0,
+                   workers=None, user_id="ai_agent", progress_every=0):
+    stats = TournamentStats()
+    start = time.perf_counter()
+    for _, result, n_shots in iter_results(n_games, strategy1, strategy2, seed,
+                                           workers, user_id):
+        stats.update(result, n_shots)
+        if progress_every and stats.games % progress_every == 0:
+            rate = stats.games / (time.perf_counter() - start)
+            print(f"{stats.games}/{n_games} oyun, {rate:.0f} oyun/sn, "
+                  f"P1: {stats.wins1}, P2: {stats.wins2}")
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Strateji turnuvası")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--p1", choices=STRATEGIES, default="agent")
+    parser.add_argument("--p2", choices=STRATEGIES, default="basic")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--user", default="ai_agent", help="ajanın Q-table kullanıcı ID'si")
+    parser.add_argument("--progress", type=int, default=0)
+    parser.add_argument("--plot", action="store_true", help="atış dağılımını çiz")
+    args = parser.parse_args(argv)
+
+    stats = run_tournament(args.games, args.p1, args.p2, args.seed,
+                           args.workers, args.user, args.progress)
+    print(f"{args.p1} Wins: {stats.wins1}, {args.p2} Wins: {stats.wins2}, "
+          f"Ortalama atış: {stats.avg_shots:.2f}")
+
+    if args.plot:
+        from matplotlib import pyplot as plt
+        values = [stats.shots[i] for i in range(17, 200)]
+        plt.bar(range(17, 200), values)
+        plt.xlabel("Total Shots")
+        plt.ylabel("Number of Games")
+        plt.title("Shot Count Distribution per Game")
+        plt.show()
+    return stats
+
+
+if __name__ == "__main__":
+    main()
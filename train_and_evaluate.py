@@ -24,18 +24,19 @@ def train_and_evaluate(n_train=300, n_eval=50,
     uid = get_username()  # use as directory name
 
     # 2) Prepare agent
-    agent = QLearningAgent(user_id=uid, alpha=alpha, gamma=gamma, epsilon=epsilon_start)
+    agent = QLearningAgent(user_id=uid, alpha=alpha, gamma=gamma, epsilon=epsilon_start,
+                           journal=True)
     # No need for separate learn; __init__ does it
 
     # 3) Training loop
     train_metrics = []  # store (episode, shots, win)
     epsilon = epsilon_start
     for episode in range(1, n_train + 1):
-        game = Game(human1=False, human2=False, username=uid)
+        game = Game(human1=False, human2=False, username=uid, track_density=True)
         while not game.over:
             if game.player1_turn:
                 prev = game.current_search.copy()
-                action = agent.choose_action(game.current_search)
+                action = agent.choose_action(game.current_search, game.current_density)
                 game.make_move(action)
                 res = game.current_search[action]
                 reward = 1 if res == 'H' else (5 if res == 'S' else -0.2)
@@ -58,10 +59,10 @@ def train_and_evaluate(n_train=300, n_eval=50,
     # 4) Evaluation loop
     eval_metrics = []
     for eval_ep in range(1, n_eval + 1):
-        game = Game(human1=False, human2=False, username=uid)
+        game = Game(human1=False, human2=False, username=uid, track_density=True)
         while not game.over:
             if game.player1_turn:
-                action = agent.choose_action(game.current_search)
+                action = agent.choose_action(game.current_search, game.current_density)
                 game.make_move(action)
             else:
                 game.basic_ai()
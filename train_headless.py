@@ -0,0 +1,144 @@
+# train_headless.py
+"""
+Ekran gerektirmeyen eğitim: aktör süreçleri bölümleri paralel oynar,
+trajektorileri tek bir öğreniciye gönderir; öğrenici update_q uygular ve
+periyodik olarak Q-table checkpoint'i yazar. pygame veya login gerektirmez.
+"""
+import argparse
+import json
+import os
+import time
+from multiprocessing import Pool
+
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+from ai_agent import QLearningAgent
+from engine import Game
+from tournament import seed_game
+
+REWARDS = {"H": 1, "S": 5, "M": -0.2}
+
+
+def epsilon_schedule(n_episodes, epsilon_start=0.9, epsilon_end=0.05, decay_rate=0.98):
+    """train_and_evaluate ile aynı çizelge: her bölümden sonra epsilon *= decay_rate."""
+    epsilons = []
+    epsilon = epsilon_start
+    for _ in range(n_episodes):
+        epsilons.append(epsilon)
+        epsilon = max(epsilon * decay_rate, epsilon_end)
+    return epsilons
+
+
+_actor = {}
+
+
+def _init_actor(user_id, model_filename, seed):
+    _actor["agent"] = QLearningAgent(user_id=user_id, model_filename=model_filename, learn=False)
+    _actor["seed"] = seed
+    _actor["mtime"] = _checkpoint_mtime(_actor["agent"])
+
+
+def _checkpoint_mtime(agent):
+    return agent.q_file.stat().st_mtime if agent.q_file.exists() else None
+
+
+def play_episode(agent, episode, epsilon, seed):
+    """Bir bölümü basic_ai'ye karşı oynar; (prev, action, reward, next) listesi döndürür."""
+    seed_game(seed, episode)
+    agent.epsilon = epsilon
+    agent.target_queue = []
+    game = Game(bitboard=True, track_density=True, log=False)
+    trajectory = []
+    while not game.over:
+        if game.player1_turn:
+            search = game.current_search
+            prev = "".join(search)
+            action = agent.choose_action(search, game.current_density)
+            game.make_move(action)
+            trajectory.append((prev, action, REWARDS[search[action]], "".join(search)))
+        else:
+            game.basic_ai()
+    return trajectory, game.n_shots, 1 if game.result == 1 else 0
+
+
+def _run_batch(batch):
+    agent = _actor["agent"]
+    # Öğrenici yeni checkpoint yazdıysa Q-table'ı yeniden yükle
+    mtime = _checkpoint_mtime(agent)
+    if mtime != _actor["mtime"]:
+        agent._load_q_table()
+        _actor["mtime"] = mtime
+    results = []
+    for episode, epsilon in batch:
+        trajectory, n_shots, win = play_episode(agent, episode, epsilon, _actor["seed"])
+        results.append((episode, epsilon, trajectory, n_shots, win))
+    return results
+
+
+def train(user_id, n_episodes=1000, workers=None, batch_size=8, seed=0,
+          alpha=0.3, gamma=0.9, epsilon_start=0.9, epsilon_end=0.05, decay_rate=0.98,
+          checkpoint_every=200, report_every=100, model_filename="qtable.pkl"):
+    learner = QLearningAgent(user_id=user_id, alpha=alpha, gamma=gamma,
+                             epsilon=epsilon_start, model_filename=model_filename, learn=False)
+    epsilons = epsilon_schedule(n_episodes, epsilon_start, epsilon_end, decay_rate)
+    batches = [list(enumerate(epsilons[i:i + batch_size], start=i + 1))
+               for i in range(0, n_episodes, batch_size)]
+
+    metrics = []
+    start = time.perf_counter()
+    last_checkpoint = 0
+    with Pool(workers, initializer=_init_actor,
+              initargs=(user_id, model_filename, seed)) as pool:
+        for results in pool.imap_unordered(_run_batch, batches):
+            for episode, epsilon, trajectory, n_shots, win in results:
+                for prev, action, reward, nxt in trajectory:
+                    learner.update_q(prev, action, reward, nxt)
+                metrics.append((episode, n_shots, win))
+                done = len(metrics)
+                if report_every and done % report_every == 0:
+                    elapsed = time.perf_counter() - start
+                    wins = sum(w for _, _, w in metrics[-report_every:])
+                    print(f"{done}/{n_episodes} bölüm, {done / elapsed:.1f} bölüm/sn, "
+                          f"epsilon {epsilon:.3f}, son {report_every} bölüm kazanma "
+                          f"%{wins * 100 / report_every:.1f}, {len(learner.q_table)} state")
+            if len(metrics) - last_checkpoint >= checkpoint_every:
+                learner.save()
+                last_checkpoint = len(metrics)
+    learner.save()
+
+    metrics.sort()
+    elapsed = time.perf_counter() - start
+    out = learner.user_dir / "train_headless_metrics.json"
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump({
+            "train": metrics,
+            "episodes_per_sec": n_episodes / elapsed if elapsed > 0 else None,
+            "params": {"alpha": alpha, "gamma": gamma, "epsilon_start": epsilon_start,
+                       "epsilon_end": epsilon_end, "decay_rate": decay_rate, "seed": seed},
+        }, f, indent=2)
+    print(f"{n_episodes} bölüm {elapsed:.1f} sn'de tamamlandı; metrikler: {out}")
+    return metrics
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ekransız paralel Q-learning eğitimi")
+    parser.add_argument("--user", default="ai_agent")
+    parser.add_argument("--episodes", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--batch", type=int, default=8, help="aktör görevi başına bölüm")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--alpha", type=float, default=0.3)
+    parser.add_argument("--gamma", type=float, default=0.9)
+    parser.add_argument("--epsilon-start", type=float, default=0.9)
+    parser.add_argument("--epsilon-end", type=float, default=0.05)
+    parser.add_argument("--decay", type=float, default=0.98)
+    parser.add_argument("--checkpoint-every", type=int, default=200)
+    parser.add_argument("--report-every", type=int, default=100)
+    args = parser.parse_args(argv)
+    train(args.user, args.episodes, args.workers, args.batch, args.seed,
+          args.alpha, args.gamma, args.epsilon_start, args.epsilon_end, args.decay,
+          args.checkpoint_every, args.report_every)
+
+
+if __name__ == "__main__":
+    main()